@@ -15,7 +15,12 @@ bl_info = {
     "category": "Import-Export",
 }
 
+import os
+import sys
+from functools import lru_cache
+
 import bpy
+from bpy.app.handlers import persistent
 from bpy.types import AddonPreferences
 from bpy.props import (
     StringProperty,
@@ -27,7 +32,7 @@ from bpy.props import (
 )
 
 # 导入UI模块
-from .ui.export_panel import BigWorldExportSettings
+from .ui.export_panel import BigWorldExportSettings, BigWorldFileOptionsMixin
 from .ui.object_panel import (
     BigWorldObjectProperties,
     BigWorldAction,
@@ -51,7 +56,93 @@ from .writers.audit_writer import AuditLogger
 
 # ==================== 导出操作 ====================
 
-class BigWorldExportOperator(bpy.types.Operator):
+@lru_cache(maxsize=32)
+def _resolve_dir(raw_path: str, blend_filepath: str) -> str:
+    """
+    解析目录设置为规范化的绝对路径（支持 Blender 的 "//" 相对路径）
+    
+    结果按 (原始路径, .blend 路径) 缓存："//" 相对于当前 .blend 文件，
+    文件另存为其它位置后缓存键随之变化
+    
+    参数:
+        raw_path: 用户设置的路径
+        blend_filepath: 当前 .blend 文件路径（bpy.data.filepath）
+    
+    返回:
+        规范化的绝对路径
+    """
+    return os.path.normpath(bpy.path.abspath(raw_path))
+
+
+# 可导出的对象类型（目前只导出网格对象）
+_EXPORT_TYPES = frozenset(("MESH",))
+
+# 插件偏好设置（首次使用时解析，加载文件/注销时失效）
+_addon_prefs = None
+
+
+def _get_addon_prefs(context):
+    """
+    获取插件偏好设置（缓存解析结果，避免每次导出都查 addons 表）
+    
+    参数:
+        context: Blender 上下文
+    
+    返回:
+        BigWorldAddonPreferences
+    """
+    global _addon_prefs
+    if _addon_prefs is None:
+        _addon_prefs = context.preferences.addons[__name__].preferences
+    return _addon_prefs
+
+
+@persistent
+def _invalidate_addon_prefs(*args) -> None:
+    """加载文件后清空偏好设置缓存"""
+    global _addon_prefs
+    _addon_prefs = None
+
+
+_CACHE_HANDLERS = (
+    (bpy.app.handlers.load_post, _invalidate_addon_prefs),
+)
+
+
+def _collect_export_objects(context, export_mode: str) -> list:
+    """
+    按导出模式收集待导出对象（每次导出只遍历一次场景/选择集）
+    
+    参数:
+        context: Blender 上下文
+        export_mode: SELECTED（第一个选中的网格）/ ALL（所有选中的网格）/ SCENE（场景中所有网格）
+    
+    返回:
+        对象列表
+    """
+    if export_mode == 'SELECTED':
+        first = next((obj for obj in context.selected_objects if obj.type in _EXPORT_TYPES), None)
+        return [first] if first is not None else []
+    if export_mode == 'ALL':
+        return [obj for obj in context.selected_objects if obj.type in _EXPORT_TYPES]
+    if export_mode == 'SCENE':
+        # 每次导出时重新遍历场景（一次 O(n)），不缓存对象引用：
+        # 脚本增删对象后立即导出时，缓存的引用可能已失效
+        return [obj for obj in context.scene.objects if obj.type in _EXPORT_TYPES]
+    return []
+
+
+# 导出开始时的信息头（一次 logger.info 输出，日志被过滤时不做格式化）
+_EXPORT_HEADER = (
+    "导出模式: %s\n"
+    "导出类型: %s\n"
+    "检测到 %d 个对象待导出\n"
+    "对象列表: %s\n"
+    "输出目录: %s"
+)
+
+
+class BigWorldExportOperator(BigWorldFileOptionsMixin, bpy.types.Operator):
     """BigWorld 导出操作"""
     bl_idname = "bigworld.export"
     bl_label = "导出到 BigWorld"
@@ -92,42 +183,13 @@ class BigWorldExportOperator(bpy.types.Operator):
     )
     
     # ==================== 文件生成选项 ====================
-    export_primitives: bpy.props.BoolProperty(
-        name=".primitives",
-        description="生成 .primitives 文件",
-        default=True
-    )
-    
-    export_visual: bpy.props.BoolProperty(
-        name=".visual",
-        description="生成 .visual 文件",
-        default=True
-    )
-    
-    export_animation: bpy.props.BoolProperty(
-        name=".animation",
-        description="生成 .animation 文件（角色模型）",
-        default=True
-    )
-    
+    # 其余选项来自 BigWorldFileOptionsMixin
     export_model: bpy.props.BoolProperty(
         name=".model",
         description="生成 .model 文件",
         default=True
     )
     
-    export_manifest: bpy.props.BoolProperty(
-        name="manifest.json",
-        description="生成 manifest.json 清单",
-        default=True
-    )
-    
-    export_audit: bpy.props.BoolProperty(
-        name="audit.log",
-        description="生成 audit.log 审计日志",
-        default=True
-    )
-    
     # ==================== 批量动画导出 ====================
     batch_export_animations: bpy.props.BoolProperty(
         name="批量导出动画",
@@ -135,80 +197,76 @@ class BigWorldExportOperator(bpy.types.Operator):
         default=True
     )
     
+    # ==================== 增量导出 ====================
+    force_rewrite: bpy.props.BoolProperty(
+        name="强制重写",
+        description="忽略 manifest 中记录的指纹，重写所有文件（默认跳过源数据未变化的文件）",
+        default=False
+    )
+    
     def execute(self, context):
         """执行导出操作"""
         # 获取场景设置
         scene = context.scene
-        prefs = context.preferences.addons[__name__].preferences
+        prefs = _get_addon_prefs(context)
         
         # 创建基础日志记录器
-        logger = Logger()
+        # 没有终端（GUI 启动、脚本批量导出）且未开启详细日志时只输出警告和错误，
+        # 避免每个对象的大量 INFO 行写入缓慢的管道或空设备
+        verbose = prefs.verbose_log or sys.stdout.isatty()
+        logger = Logger(level="INFO" if verbose else "WARNING")
         audit_logger = None  # 初始化为None，避免在异常处理时未定义
+        processor = None     # 同上；finally 中释放其线程池与 manifest.log 句柄
         
         try:
             # 获取输出目录（优先使用文件浏览器选择的路径）
-            import os
             if self.filepath:
                 # 用户通过文件浏览器选择的路径
-                output_dir = os.path.dirname(self.filepath) if os.path.isfile(self.filepath) else self.filepath
+                filepath = _resolve_dir(self.filepath, bpy.data.filepath)
+                output_dir = os.path.dirname(filepath) if os.path.isfile(filepath) else filepath
             elif prefs.root_path:
                 # 使用Preferences中的root_path
-                output_dir = prefs.root_path
+                output_dir = _resolve_dir(prefs.root_path, bpy.data.filepath)
             else:
                 self.report({'ERROR'}, "请选择导出目录或设置Root Path（Preferences → BigWorld Exporter）")
                 return {'CANCELLED'}
             
-            # 确保输出目录存在
-            if not os.path.exists(output_dir):
+            # 确保输出目录存在（已存在时只有一次 stat）
+            if not os.path.isdir(output_dir):
                 os.makedirs(output_dir, exist_ok=True)
             
-            # 创建审计日志记录器（需要输出目录）
+            # 创建审计日志记录器（需要输出目录；未勾选 audit.log 时不创建、不写出）
             audit_log_path = os.path.join(output_dir, "audit.log")
-            audit_logger = AuditLogger(audit_log_path)
+            if self.export_audit:
+                audit_logger = AuditLogger(audit_log_path)
             
             # 创建导出设置
             settings = ExportSettings()
-            settings.root_path = prefs.root_path  # 使用偏好设置的Res根目录
+            # 使用偏好设置的Res根目录（与输出目录按同样方式解析，保证相对路径计算一致）
+            settings.root_path = _resolve_dir(prefs.root_path, bpy.data.filepath) if prefs.root_path else ""
             settings.unit_scale = scene.unit_settings.scale_length
             settings.auto_validate = True
             settings.write_audit = self.export_audit
             
-            # 获取要导出的对象
-            selected_meshes = []
-            if self.export_mode == 'SELECTED':
-                # 选中导出：只导出第一个选中的网格对象
-                for obj in context.selected_objects:
-                    if obj.type == 'MESH':
-                        selected_meshes.append(obj)
-                        break
-            elif self.export_mode == 'ALL':
-                # 全部导出：导出所有选中的网格对象
-                for obj in context.selected_objects:
-                    if obj.type == 'MESH':
-                        selected_meshes.append(obj)
-            elif self.export_mode == 'SCENE':
-                # 场景导出：导出场景中所有网格对象
-                for obj in scene.objects:
-                    if obj.type == 'MESH':
-                        selected_meshes.append(obj)
+            # 获取要导出的对象（只收集一次，后续统计与导出循环复用同一列表）
+            selected_meshes = _collect_export_objects(context, self.export_mode)
             
             if not selected_meshes:
                 self.report({'ERROR'}, "没有找到要导出的网格对象")
                 return {'CANCELLED'}
             
             # 记录导出信息
-            logger.info(f"导出模式: {self.export_mode}")
-            logger.info(f"导出类型: {self.export_type}")
-            logger.info(f"检测到 {len(selected_meshes)} 个对象待导出")
-            logger.info(f"对象列表: {[obj.name for obj in selected_meshes]}")
-            logger.info(f"输出目录: {output_dir}")
+            logger.info(_EXPORT_HEADER, self.export_mode, self.export_type, len(selected_meshes),
+                        [obj.name for obj in selected_meshes], output_dir)
             
             # 创建导出处理器
-            processor = ExportProcessor(settings, logger, output_dir)
+            processor = ExportProcessor(settings, logger, output_dir, force_rewrite=self.force_rewrite)
             
-            # 循环导出每个对象
-            export_count = 0
-            for idx, obj in enumerate(selected_meshes):
+            # 文件生成选项（所有对象共用，只构造一次）
+            file_options = self.file_options()
+            
+            # 循环导出每个对象（主线程构建下一个对象时，上一个对象的文件在后台写出）
+            def log_begin(idx, obj):
                 logger.info(f"\n{'='*60}")
                 logger.info(f"导出对象 {idx + 1}/{len(selected_meshes)}: {obj.name}")
                 logger.info(f"{'='*60}")
@@ -220,55 +278,46 @@ class BigWorldExportOperator(bpy.types.Operator):
                 else:
                     obj_resource_id = obj.name
                     logger.info(f"使用对象名称作为资源ID: {obj_resource_id}")
-                
-                # 准备文件选项
-                file_options = {
-                    'export_primitives': self.export_primitives,
-                    'export_visual': self.export_visual,
-                    'export_animation': self.export_animation,
-                    'export_model': self.export_model,
-                    'export_manifest': self.export_manifest,
-                    'export_audit': self.export_audit
-                }
-                
-                # 使用ExportProcessor处理对象
-                try:
-                    success = processor.process_object(obj, self.export_type, file_options)
-                    
-                    if success:
-                        export_count += 1
-                        logger.info(f"✅ {obj.name} 导出完成 ({idx + 1}/{len(selected_meshes)})")
-                    else:
-                        logger.error(f"❌ {obj.name} 导出失败")
-                
-                except Exception as e:
-                    logger.error(f"❌ {obj.name} 导出异常: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
-                    continue
+            
+            export_count = 0
+            results = processor.process_objects(selected_meshes, self.export_type, file_options,
+                                                on_begin=log_begin)
+            for idx, (obj, success) in enumerate(results):
+                if success:
+                    export_count += 1
+                    logger.info(f"✅ {obj.name} 导出完成 ({idx + 1}/{len(selected_meshes)})")
+                else:
+                    logger.error(f"❌ {obj.name} 导出失败")
+            
+            # 写出 manifest（所有对象导出完成后统一保存一次）
+            processor.finalize()
             
             # 保存日志
-            audit_logger.save()
+            if audit_logger:
+                audit_logger.save()
             
-            # 最终报告
-            logger.info(f"\n{'='*60}")
-            logger.info(f"导出完成统计")
-            logger.info(f"{'='*60}")
-            logger.info(f"总对象数: {len(selected_meshes)}")
-            logger.info(f"成功导出: {export_count}")
-            logger.info(f"失败数量: {len(selected_meshes) - export_count}")
+            # 最终报告（整段拼好后一次输出）
+            separator = '=' * 60
+            logger.info("\n".join((
+                f"\n{separator}",
+                "导出完成统计",
+                separator,
+                f"总对象数: {len(selected_meshes)}",
+                f"成功导出: {export_count}",
+                f"失败数量: {len(selected_meshes) - export_count}",
+            )))
             
             if export_count > 0:
                 self.report({'INFO'}, f"导出完成！成功: {export_count}/{len(selected_meshes)}")
                 return {'FINISHED'}
             else:
-                self.report({'ERROR'}, "所有对象导出失败，请查看 audit.log")
+                # 报告中只给出日志位置，不复制日志内容
+                log_hint = audit_log_path if audit_logger else "控制台输出"
+                self.report({'ERROR'}, f"所有对象导出失败，请查看 {log_hint}")
                 return {'CANCELLED'}
         
         except Exception as e:
-            logger.error(f"导出异常: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.error("导出异常: %s", e, exc_info=True)
             
             # 保存审计日志（如果已创建）
             if audit_logger:
@@ -276,6 +325,10 @@ class BigWorldExportOperator(bpy.types.Operator):
             
             self.report({'ERROR'}, f"导出异常: {e}")
             return {'CANCELLED'}
+        
+        finally:
+            if processor is not None:
+                processor.close()
     
     def invoke(self, context, event):
         """调用导出对话框"""
@@ -305,6 +358,7 @@ class BigWorldExportOperator(bpy.types.Operator):
         if self.export_type == 'CHARACTER':
             box.prop(self, "export_animation")
             box.prop(self, "batch_export_animations")
+        box.prop(self, "force_rewrite")
         
         # 日志选项
         box = layout.box()
@@ -347,6 +401,11 @@ def register():
     # 注册到 File → Export 菜单
     bpy.types.TOPBAR_MT_file_export.append(menu_func_export)
     
+    # 偏好设置缓存的失效回调
+    for handlers, func in _CACHE_HANDLERS:
+        if func not in handlers:
+            handlers.append(func)
+    
     # 注册其他UI面板并绑定属性
     from .ui.export_panel import register as register_export_panel
     from .ui.object_panel import register as register_object_panel
@@ -373,6 +432,12 @@ def unregister():
     # 从 File → Export 菜单移除
     bpy.types.TOPBAR_MT_file_export.remove(menu_func_export)
     
+    # 移除缓存失效回调
+    for handlers, func in _CACHE_HANDLERS:
+        if func in handlers:
+            handlers.remove(func)
+    _invalidate_addon_prefs()
+    
     # 注销UI面板
     bpy.utils.unregister_class(BIGWORLD_PT_object_panel)
     
@@ -7,6 +7,7 @@
 import bpy
 from ...core.schema import HardPoint
 from ...core.coordinate_converter import CoordinateConverter
+from ...core.io.xml_writer import IDENTITY_MATRIX_4X3
 
 
 class HardpointBuilder:
@@ -58,12 +59,7 @@ class HardpointBuilder:
             transform = HardpointBuilder._get_transform_from_empty(config.target_empty)
         else:
             # 使用单位矩阵（硬点位于骨骼原点）
-            transform = [
-                [1.0, 0.0, 0.0],
-                [0.0, 1.0, 0.0],
-                [0.0, 0.0, 1.0],
-                [0.0, 0.0, 0.0]
-            ]
+            transform = IDENTITY_MATRIX_4X3
         
         return HardPoint(
             name=config.name,
@@ -87,33 +83,23 @@ class HardpointBuilder:
         if not skeleton or not skeleton.bones:
             return None
         
-        # 查找骨骼
-        bone = None
-        for b in skeleton.bones:
-            if b.name == bone_name:
-                bone = b
-                break
+        # 骨骼名称 → 骨骼（一次构建，向上查找父骨骼时直接取）
+        bone_map = {b.name: b for b in skeleton.bones}
         
+        bone = bone_map.get(bone_name)
         if not bone:
             return None
         
         # 构建从Scene Root到该骨骼的完整路径
         path_parts = ["Scene Root"]
-        current_bone = bone
         
         # 收集所有父骨骼
-        bone_chain = [current_bone]
-        while current_bone.parent_name:
-            parent = None
-            for b in skeleton.bones:
-                if b.name == current_bone.parent_name:
-                    parent = b
-                    break
-            if parent:
-                bone_chain.insert(0, parent)
-                current_bone = parent
-            else:
-                break
+        bone_chain = [bone]
+        parent = bone_map.get(bone.parent) if bone.parent else None
+        while parent:
+            bone_chain.append(parent)
+            parent = bone_map.get(parent.parent) if parent.parent else None
+        bone_chain.reverse()
         
         # 构建路径
         for b in bone_chain:
@@ -135,16 +121,8 @@ class HardpointBuilder:
         # 获取Empty的局部矩阵
         matrix = empty_obj.matrix_local
         
-        # 转换为BigWorld坐标系
-        converted_matrix = CoordinateConverter.convert_matrix(matrix)
-        
-        # 转换为4x3格式
-        transform = [
-            [converted_matrix[0][0], converted_matrix[0][1], converted_matrix[0][2]],
-            [converted_matrix[1][0], converted_matrix[1][1], converted_matrix[1][2]],
-            [converted_matrix[2][0], converted_matrix[2][1], converted_matrix[2][2]],
-            [converted_matrix[0][3], converted_matrix[1][3], converted_matrix[2][3]]
-        ]
+        # 转换为BigWorld坐标系，直接输出4x3格式
+        transform = CoordinateConverter.convert_matrix_4x3(matrix)
         
         return transform
 
@@ -6,8 +6,47 @@
 # - 转换矩阵：X 不变，Y ↔ Z，并调整方向
 
 import mathutils
+import numpy as np
 from mathutils import Vector, Matrix, Quaternion
-from typing import Tuple, List
+from typing import Tuple, List, Optional
+
+
+# convert_matrix 的闭式展开表（由 C @ M @ C⁻¹ 符号展开，C 为下方的 CONVERSION_MATRIX）
+# BigWorld 第 i 轴 = _AXIS_SIGN[i] * Blender 第 _AXIS_PERM[i] 轴，即 (X, Z, -Y)
+# 输出元素 (r, c) = sign * M[src_row][src_col]，第 4 列为位移（只按行变换）
+_AXIS_PERM = (0, 2, 1)
+_AXIS_SIGN = (1.0, 1.0, -1.0)
+_AXIS_NEGATED = [i for i, sign in enumerate(_AXIS_SIGN) if sign < 0]
+_AXIS_MAP_TABLE = tuple(
+    tuple(
+        (_AXIS_PERM[r], _AXIS_PERM[c], _AXIS_SIGN[r] * _AXIS_SIGN[c]) if c < 3
+        else (_AXIS_PERM[r], 3, _AXIS_SIGN[r])
+        for c in range(4)
+    )
+    for r in range(3)
+)
+
+
+def _build_4x3_table(negate_translation_y: bool):
+    """
+    生成 convert_matrix_4x3 的取值表：坐标转换与 4x3 排布（3行旋转 + 1行位移）合并为一步
+    
+    参数:
+        negate_translation_y: 是否对转换后的 Y 位移取反
+    
+    返回:
+        4 行 × 3 列的 (src_row, src_col, sign)
+    """
+    rotation_rows = tuple(row[:3] for row in _AXIS_MAP_TABLE)
+    translation_row = tuple(
+        (src_row, src_col, -sign if (negate_translation_y and c == 1) else sign)
+        for c, (src_row, src_col, sign) in enumerate(row[3] for row in _AXIS_MAP_TABLE)
+    )
+    return rotation_rows + (translation_row,)
+
+
+_AXIS_MAP_4X3_TABLE = _build_4x3_table(False)
+_AXIS_MAP_4X3_FLIP_Y_TABLE = _build_4x3_table(True)
 
 
 class CoordinateConverter:
@@ -50,8 +89,9 @@ class CoordinateConverter:
         返回:
             BigWorld 位置 (X, Z, -Y)
         """
-        converted = CoordinateConverter.CONVERSION_MATRIX @ blender_pos
-        return (converted.x, converted.y, converted.z)
+        # CONVERSION_MATRIX 只是轴置换加取反，直接交换分量，不做矩阵乘法
+        # （用 0.0 - y 而不是 -y，避免 y 为 0 时产生 -0.0）
+        return (blender_pos[0], blender_pos[2], 0.0 - blender_pos[1])
     
     @staticmethod
     def convert_normal(blender_normal: Vector) -> Tuple[float, float, float]:
@@ -64,8 +104,8 @@ class CoordinateConverter:
         返回:
             BigWorld 法线 (X, Z, -Y)
         """
-        converted = CoordinateConverter.CONVERSION_MATRIX @ blender_normal
-        return (converted.x, converted.y, converted.z)
+        # 与 convert_position 相同的分量置换
+        return (blender_normal[0], blender_normal[2], 0.0 - blender_normal[1])
     
     @staticmethod
     def convert_tangent(blender_tangent: Vector) -> Tuple[float, float, float]:
@@ -78,8 +118,8 @@ class CoordinateConverter:
         返回:
             BigWorld 切线 (X, Z, -Y)
         """
-        converted = CoordinateConverter.CONVERSION_MATRIX @ blender_tangent
-        return (converted.x, converted.y, converted.z)
+        # 与 convert_position 相同的分量置换
+        return (blender_tangent[0], blender_tangent[2], 0.0 - blender_tangent[1])
     
     @staticmethod
     def convert_matrix(blender_matrix: Matrix) -> List[List[float]]:
@@ -93,33 +133,55 @@ class CoordinateConverter:
             BigWorld 4x4 矩阵（列表形式）
         """
         # 转换矩阵 = CONVERSION_MATRIX @ blender_matrix @ INVERSE_CONVERSION_MATRIX
-        # 简化：直接转换位置部分和旋转部分
-        
-        # 提取位置
-        translation = blender_matrix.to_translation()
-        converted_translation = CoordinateConverter.CONVERSION_MATRIX @ translation
-        
-        # 提取旋转（3x3）
-        rotation_3x3 = blender_matrix.to_3x3()
-        converted_rotation = CoordinateConverter.CONVERSION_MATRIX @ rotation_3x3 @ CoordinateConverter.INVERSE_CONVERSION_MATRIX
-        
-        # 重建 4x4 矩阵
-        result = Matrix.Identity(4)
-        result[0][:3] = converted_rotation[0]
-        result[1][:3] = converted_rotation[1]
-        result[2][:3] = converted_rotation[2]
-        result[0][3] = converted_translation.x
-        result[1][3] = converted_translation.y
-        result[2][3] = converted_translation.z
-        
-        # 转换为列表
+        # CONVERSION_MATRIX 是带符号的置换矩阵，结果的每个元素只是原矩阵某个元素的 ±1 倍，
+        # 按 _AXIS_MAP_TABLE 直接取值即可，无需矩阵乘法
+        # （+ 0.0 把 -0.0 归一为 0.0，与矩阵乘法的输出保持一致）
+        m = blender_matrix
+        result = [
+            [sign * m[src_row][src_col] + 0.0 for src_row, src_col, sign in row]
+            for row in _AXIS_MAP_TABLE
+        ]
+        result.append([0.0, 0.0, 0.0, 1.0])
+        return result
+    
+    @staticmethod
+    def convert_matrix_4x3(blender_matrix: Matrix, negate_translation_y: bool = False) -> List[List[float]]:
+        """
+        转换 4x4 变换矩阵并直接输出 BigWorld 4x3 格式（3行旋转 + 1行位移）
+        
+        等价于 convert_matrix 后再取旋转/位移重新排布，但只读取一次源矩阵
+        
+        参数:
+            blender_matrix: Blender 4x4 矩阵
+            negate_translation_y: 是否对转换后的 Y 位移取反（骨骼矩阵需要）
+        
+        返回:
+            4x3 矩阵（列表形式）
+        """
+        table = _AXIS_MAP_4X3_FLIP_Y_TABLE if negate_translation_y else _AXIS_MAP_4X3_TABLE
+        m = blender_matrix
         return [
-            [result[0][0], result[0][1], result[0][2], result[0][3]],
-            [result[1][0], result[1][1], result[1][2], result[1][3]],
-            [result[2][0], result[2][1], result[2][2], result[2][3]],
-            [result[3][0], result[3][1], result[3][2], result[3][3]]
+            [sign * m[src_row][src_col] + 0.0 for src_row, src_col, sign in row]
+            for row in table
         ]
     
+    @staticmethod
+    def convert_matrix_4x3_array(matrices: np.ndarray, negate_translation_y: bool = False) -> np.ndarray:
+        """
+        convert_matrix_4x3 的批量版本（结果逐位一致）
+        
+        参数:
+            matrices: (N, 4, 4) Blender 矩阵数组
+            negate_translation_y: 是否对转换后的 Y 位移取反（骨骼矩阵需要）
+        
+        返回:
+            (N, 4, 3) float64 数组（BigWorld 4x3 格式）
+        """
+        src_rows, src_cols, signs = np.moveaxis(
+            np.array(_AXIS_MAP_4X3_FLIP_Y_TABLE if negate_translation_y else _AXIS_MAP_4X3_TABLE), -1, 0
+        )
+        return matrices[:, src_rows.astype(np.intp), src_cols.astype(np.intp)] * signs + 0.0
+    
     @staticmethod
     def convert_quaternion(blender_quat: Quaternion) -> Tuple[float, float, float, float]:
         """
@@ -142,6 +204,31 @@ class CoordinateConverter:
         # BigWorld 四元数顺序：(X, Y, Z, W)
         return (converted_quat.x, converted_quat.y, converted_quat.z, converted_quat.w)
     
+    @staticmethod
+    def convert_quaternion_array(quats: np.ndarray) -> np.ndarray:
+        """
+        批量转换四元数（convert_quaternion 的向量化版本）
+        
+        坐标系转换 C 是旋转（行列式为 1），C·R·C⁻¹ 对应的四元数实部不变、
+        虚部按位置同样的轴置换与取反转换，因此无需经过矩阵
+        
+        参数:
+            quats: (..., 4) Blender 四元数数组 (W, X, Y, Z)
+        
+        返回:
+            (..., 4) float64 BigWorld 四元数数组 (X, Y, Z, W)，已归一化，W 非负（与 Matrix.to_quaternion 一致）
+        """
+        q = np.asarray(quats, dtype=np.float64)
+        converted = np.empty_like(q)
+        converted[..., :3] = q[..., 1:][..., _AXIS_PERM] * np.array(_AXIS_SIGN)
+        converted[..., 3] = q[..., 0]
+        
+        # 归一化，并统一为 W 非负的一侧（q 与 -q 表示同一旋转）
+        norm = np.sqrt(np.sum(converted * converted, axis=-1, keepdims=True))
+        norm = np.where(converted[..., 3:] < 0.0, -norm, norm)
+        converted /= np.where(norm != 0.0, norm, 1.0)
+        return converted + 0.0
+    
     @staticmethod
     def convert_euler(blender_euler: mathutils.Euler) -> Tuple[float, float, float]:
         """
@@ -183,11 +270,8 @@ class CoordinateConverter:
         返回:
             BigWorld 包围盒 ((min_x, min_y, min_z), (max_x, max_y, max_z))
         """
-        min_pt = Vector(blender_bbox[0])
-        max_pt = Vector(blender_bbox[1])
-        
-        converted_min = CoordinateConverter.convert_position(min_pt)
-        converted_max = CoordinateConverter.convert_position(max_pt)
+        converted_min = CoordinateConverter.convert_position(blender_bbox[0])
+        converted_max = CoordinateConverter.convert_position(blender_bbox[1])
         
         # 转换后需要重新计算 min/max（因为 Y 和 Z 交换了）
         final_min = (
@@ -234,24 +318,64 @@ class CoordinateConverter:
         返回:
             (转换后的顶点列表, 转换后的法线列表)
         """
-        converted_vertices = []
         converted_normals = []
         
-        for v in vertices:
-            converted = CoordinateConverter.convert_position(v)
-            # 应用单位缩放
-            converted = (
-                CoordinateConverter.apply_unit_scale(converted[0], unit_scale),
-                CoordinateConverter.apply_unit_scale(converted[1], unit_scale),
-                CoordinateConverter.apply_unit_scale(converted[2], unit_scale)
-            )
-            converted_vertices.append(converted)
+        # 轴置换与单位缩放合并为一步（缩放为 1 时不做乘法）
+        if unit_scale == 1.0:
+            converted_vertices = [(v[0], v[2], 0.0 - v[1]) for v in vertices]
+        else:
+            converted_vertices = [
+                (v[0] * unit_scale, v[2] * unit_scale, (0.0 - v[1]) * unit_scale)
+                for v in vertices
+            ]
         
         if normals:
             for n in normals:
                 converted_normals.append(CoordinateConverter.convert_normal(n))
         
         return (converted_vertices, converted_normals)
+    
+    @staticmethod
+    def compose_transform(blender_matrix: Optional[Matrix] = None, unit_scale: float = 1.0) -> np.ndarray:
+        """
+        将坐标系转换与单位缩放合并进一个 4x4 变换矩阵
+        
+        对 Blender 坐标 p 有 compose_transform(M, s) @ p = s * convert_position(M @ p)，
+        批量变换顶点时一次矩阵乘法即可得到 BigWorld 坐标
+        
+        参数:
+            blender_matrix: Blender 4x4 变换（如 matrix_world），None 表示单位矩阵
+            unit_scale: 单位缩放
+        
+        返回:
+            4x4 float64 数组
+        """
+        transform = np.zeros((4, 4))
+        transform[(0, 1, 2), _AXIS_PERM] = _AXIS_SIGN
+        transform[:3] *= unit_scale
+        transform[3, 3] = 1.0
+        if blender_matrix is not None:
+            transform = transform @ np.array(blender_matrix, dtype=np.float64)
+        return transform
+    
+    @staticmethod
+    def convert_vector_array(values: np.ndarray, unit_scale: float = 1.0) -> np.ndarray:
+        """
+        批量转换 (N, 3) 位置/法线数组（与 convert_position 相同的分量置换）
+        
+        参数:
+            values: Blender 坐标数组 (N, 3)
+            unit_scale: 单位缩放（法线传 1.0）
+        
+        返回:
+            BigWorld 坐标数组 (N, 3)，每行为 (X, Z, -Y)
+        """
+        converted = values[:, _AXIS_PERM]
+        # 与 convert_position 一致：用 0.0 - v 取反，避免产生 -0.0
+        converted[:, _AXIS_NEGATED] = 0.0 - converted[:, _AXIS_NEGATED]
+        if unit_scale != 1.0:
+            converted *= unit_scale
+        return converted
 
 
 # ==================== 便捷函数 ====================
@@ -285,42 +409,3 @@ def convert_to_bigworld(blender_vector: Vector,
         return CoordinateConverter.convert_scale(blender_vector)
     else:
         raise ValueError(f"未知的向量类型: {vector_type}")
-    
-    @staticmethod
-    def convert_quaternion(blender_quat) -> Tuple[float, float, float, float]:
-        """
-        转换四元数：Blender Z-up → BigWorld Y-up
-        
-        Blender quaternion: (w, x, y, z) in Z-up coordinate system
-        BigWorld quaternion: (x, y, z, w) in Y-up coordinate system
-        
-        转换规则:
-        1. 坐标轴转换: x不变, y→z, z→-y
-        2. 顺序转换: Blender (w,x,y,z) → BigWorld (x,y,z,w)
-        
-        参数:
-            blender_quat: Blender Quaternion
-        
-        返回:
-            BigWorld Quaternion (x, y, z, w)
-        """
-        from mathutils import Quaternion
-        
-        if isinstance(blender_quat, (tuple, list)):
-            w, x, y, z = blender_quat
-            blender_quat = Quaternion((w, x, y, z))
-        
-        # 方法：使用旋转矩阵进行坐标系转换
-        # 1. 转为矩阵
-        mat = blender_quat.to_matrix().to_4x4()
-        
-        # 2. 应用坐标系转换
-        # Z-up → Y-up: (x, y, z) → (x, z, -y)
-        converted_mat = CoordinateConverter.CONVERSION_MATRIX @ mat @ CoordinateConverter.INVERSE_CONVERSION_MATRIX
-        
-        # 3. 转回四元数
-        converted_quat = converted_mat.to_quaternion()
-        
-        # 4. 返回 BigWorld 格式: (x, y, z, w)
-        return (converted_quat.x, converted_quat.y, converted_quat.z, converted_quat.w)
-
@@ -4,7 +4,7 @@
 """
 
 from .vertex_format import build_vertex_format, get_vertex_stride, parse_vertex_format
-from .packed_normal import pack_normal, unpack_normal
+from .packed_normal import pack_normal, pack_normals, unpack_normal
 from .quaternion import normalize_quaternion, quaternion_multiply, quaternion_inverse
 
 __all__ = [
@@ -12,6 +12,7 @@ __all__ = [
     'get_vertex_stride',
     'parse_vertex_format',
     'pack_normal',
+    'pack_normals',
     'unpack_normal',
     'normalize_quaternion',
     'quaternion_multiply',
@@ -6,6 +6,8 @@ Packed Normal 处理
 
 import math
 
+import numpy as np
+
 
 def pack_normal(nx, ny, nz):
     """
@@ -42,6 +44,35 @@ def pack_normal(nx, ny, nz):
     return packed
 
 
+def pack_normals(normals):
+    """
+    批量打包法线为uint32（pack_normal 的向量化版本，结果逐位一致）
+    
+    参数:
+        normals: N个法线，(N, 3) 数组或 (nx, ny, nz) 序列
+    
+    返回:
+        np.ndarray: (N,) uint32 数组
+    """
+    n = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+    x, y, z = n[:, 0], n[:, 1], n[:, 2]
+    
+    # 归一化（长度过小的法线按 pack_normal 的约定替换为 (0, 0, 1)）
+    length = np.sqrt(x*x + y*y + z*z)
+    valid = length > 0.0001
+    length = np.where(valid, length, 1.0)
+    nx = np.where(valid, np.clip(x / length, -1.0, 1.0), 0.0)
+    ny = np.where(valid, np.clip(y / length, -1.0, 1.0), 0.0)
+    nz = np.where(valid, np.clip(z / length, -1.0, 1.0), 1.0)
+    
+    # astype 向零截断，与 int() 一致
+    x_packed = (nx * 1023.0).astype(np.int64) & 0x7ff
+    y_packed = (ny * 1023.0).astype(np.int64) & 0x7ff
+    z_packed = (nz * 511.0).astype(np.int64) & 0x3ff
+    
+    return ((z_packed << 22) | (y_packed << 11) | x_packed).astype(np.uint32)
+
+
 def unpack_normal(packed):
     """
     解包uint32为法线向量
@@ -3,11 +3,16 @@
 文件IO模块
 """
 
+from .buffering import WRITE_BUFFER_SIZE, AtomicWriteFile, open_for_write, fsync_directory
 from .bin_section_writer import BinSectionWriter
 from .packed_section_writer import PackedSectionWriter
 from .xml_writer import DataSectionWriter, DataSectionNode
 
 __all__ = [
+    'WRITE_BUFFER_SIZE',
+    'AtomicWriteFile',
+    'open_for_write',
+    'fsync_directory',
     'BinSectionWriter',
     'PackedSectionWriter',
     'DataSectionWriter',
@@ -11,9 +11,19 @@ import struct
 import time
 from typing import List, Tuple, Optional
 
+import numpy as np
+
+from .buffering import open_for_write
+
 # 常量定义（来自 bin_section.cpp）
 BINSECTION_MAGIC = 0x42A14E65
 
+# DataSectionEntry 的定长头部：BlobLength + ReservedData(16字节，全0) + TagLength
+_ENTRY_HEAD = struct.Struct("<I16xI")
+
+# 定长字符串打包器，按长度缓存（struct 的 "s" 字段自动截断并以 0 填充）
+_FIXED_STRING_PACKERS = {}
+
 
 class BinSectionWriter:
     """
@@ -48,7 +58,7 @@ class BinSectionWriter:
         """打开文件并写入 magic number"""
         if self.fp is not None:
             raise RuntimeError("BinSectionWriter already opened")
-        self.fp = open(self.filepath, "wb")
+        self.fp = open_for_write(self.filepath, "wb")
         
         # 仅写入 magic number（4 bytes）
         self.fp.write(struct.pack("<I", BINSECTION_MAGIC))
@@ -62,23 +72,22 @@ class BinSectionWriter:
         # 记录 index table 开始位置
         index_table_start = self.fp.tell()
         
-        # 写入所有 DataSectionEntry
+        # 所有 DataSectionEntry 先拼到一个缓冲区，再一次写入
+        index_table = bytearray()
         for tag, offset, length in self.sections:
-            # 1. BlobLength (4 bytes)
-            self.fp.write(struct.pack("<I", length))
+            tag_bytes = tag.encode("ascii")
             
+            # 1. BlobLength (4 bytes)
             # 2. ReservedData (16 bytes) - 根据BigWorld源码，应该全部为0
-            self.fp.write(b"\x00" * 16)
-            
             # 3. TagLength (4 bytes)
-            tag_bytes = tag.encode("ascii")
-            self.fp.write(struct.pack("<I", len(tag_bytes)))
+            index_table += _ENTRY_HEAD.pack(length, len(tag_bytes))
             
             # 4. TagValue (变长，4字节对齐)
-            self.fp.write(tag_bytes)
-            # 对齐到 4 字节
-            while self.fp.tell() % 4 != 0:
-                self.fp.write(b"\x00")
+            index_table += tag_bytes
+            # 对齐到 4 字节（按文件绝对位置计算填充长度）
+            index_table += b"\x00" * (-(index_table_start + len(index_table)) % 4)
+        
+        self.fp.write(index_table)
         
         # 5. IndexTableLength (4 bytes) - index table 的长度（不包括这4字节）
         index_table_length = self.fp.tell() - index_table_start
@@ -87,6 +96,12 @@ class BinSectionWriter:
         self.fp.close()
         self.fp = None
 
+    def abort(self) -> None:
+        """放弃写入（出错时调用）：丢弃临时文件，目标文件保持不变"""
+        if self.fp is not None:
+            self.fp.discard()
+            self.fp = None
+
     # --- section 控制 ---
     def begin_section(self, tag: str) -> None:
         """开始一个新的 section"""
@@ -113,8 +128,7 @@ class BinSectionWriter:
         ))
         
         # 对齐到 4 字节
-        while self.fp.tell() % 4 != 0:
-            self.fp.write(b"\x00")
+        self.fp.write(b"\x00" * (-end_offset % 4))
         
         self._curr_tag = None
         self._start_offset = 0
@@ -126,9 +140,10 @@ class BinSectionWriter:
         if fixed_len is None:
             self.fp.write(bs + b"\x00")
         else:
-            if len(bs) > fixed_len:
-                bs = bs[:fixed_len]
-            self.fp.write(bs + b"\x00" * (fixed_len - len(bs)))
+            pack = _FIXED_STRING_PACKERS.get(fixed_len)
+            if pack is None:
+                pack = _FIXED_STRING_PACKERS[fixed_len] = struct.Struct(f"{fixed_len}s").pack
+            self.fp.write(pack(bs))
 
     def write_uint32(self, v: int) -> None:
         """写入 uint32"""
@@ -151,14 +166,12 @@ class BinSectionWriter:
         self.fp.write(struct.pack("<fff", float(v[0]), float(v[1]), float(v[2])))
 
     def write_indices_u16(self, indices) -> None:
-        """写入 uint16 索引数组"""
-        for i in indices:
-            self.fp.write(struct.pack("<H", int(i)))
+        """写入 uint16 索引数组（整块转换后一次写入）"""
+        self.fp.write(np.asarray(indices, dtype="<u2").tobytes())
 
     def write_indices_u32(self, indices) -> None:
-        """写入 uint32 索引数组"""
-        for i in indices:
-            self.fp.write(struct.pack("<I", int(i)))
+        """写入 uint32 索引数组（整块转换后一次写入）"""
+        self.fp.write(np.asarray(indices, dtype="<u4").tobytes())
     
     def write_bytes(self, data: bytes) -> None:
         """写入原始字节数据"""
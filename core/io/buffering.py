@@ -0,0 +1,115 @@
+# File: core/io/buffering.py
+# Purpose: 输出文件的写缓冲与原子替换
+# Notes:
+# - 各 writer 按字段/记录逐个 write（头部、每个关键帧、每个 XML 节点），
+#   默认 8 KB 缓冲区会把这些小块写入拆成大量系统调用
+# - 统一用 512 KB 缓冲区打开输出文件，小块写入在用户态合并后再一次提交
+# - 先写同目录下的临时文件，关闭时 os.replace 到目标路径；
+#   出错时删除临时文件，目标路径上永远是完整的旧文件或新文件
+# - 默认不 fsync（每个文件一次同步刷盘会抵消缓冲的收益）；只有导出的提交点
+#   （manifest.json）以 fsync=True 打开
+
+import os
+import threading
+
+WRITE_BUFFER_SIZE = 512 * 1024
+
+
+class AtomicWriteFile:
+    """
+    写临时文件、关闭时原子替换目标文件的文件对象
+    
+    使用方式:
+        with AtomicWriteFile("out.model", "w", encoding="utf-8") as f:
+            f.write(...)
+        # 正常退出时替换 out.model；异常退出时丢弃临时文件，out.model 保持不变
+    
+    fsync=True 时替换前先 fsync 临时文件（用于需要落盘保证的提交点文件）
+    """
+    
+    def __init__(self, filepath: str, mode: str = "wb", fsync: bool = False, **kwargs):
+        self.filepath = filepath
+        self.fsync = fsync
+        # 同一进程内并行写入时按线程区分临时文件
+        self.temp_path = f"{filepath}.tmp.{os.getpid()}.{threading.get_ident()}"
+        self._file = open(self.temp_path, mode, buffering=WRITE_BUFFER_SIZE, **kwargs)
+        
+        # 热路径方法直接绑定，避免每次调用都经过 __getattr__
+        self.write = self._file.write
+        self.tell = self._file.tell
+        self.seek = self._file.seek
+    
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+    
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+    
+    def close(self) -> None:
+        """刷新临时文件（fsync=True 时同步到磁盘），然后原子替换目标文件；失败时删除临时文件"""
+        if self._file.closed:
+            return
+        try:
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self.temp_path, self.filepath)
+        except BaseException:
+            self.discard()
+            raise
+    
+    def discard(self) -> None:
+        """放弃写入：关闭并删除临时文件，目标文件保持不变"""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+    
+    def __enter__(self) -> "AtomicWriteFile":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+        return False
+
+
+def open_for_write(filepath: str, mode: str = "wb", fsync: bool = False, **kwargs) -> AtomicWriteFile:
+    """
+    以大写缓冲区打开输出文件（写临时文件，关闭时原子替换）
+    
+    参数:
+        filepath: 文件路径
+        mode: 打开模式（"wb" 或文本模式 "w"）
+        fsync: 替换前是否 fsync（只用于提交点文件）
+        **kwargs: 传给 open() 的其余参数（如 encoding、newline）
+    
+    返回:
+        AtomicWriteFile
+    """
+    return AtomicWriteFile(filepath, mode, fsync, **kwargs)
+
+
+def fsync_directory(directory: str) -> None:
+    """
+    fsync 目录，使其中的重命名落盘（不支持打开目录的平台上忽略，如 Windows）
+    
+    参数:
+        directory: 目录路径
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
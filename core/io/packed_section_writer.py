@@ -15,9 +15,22 @@ import struct
 from dataclasses import dataclass, field
 from typing import Any, List, Dict, Optional
 
+from .buffering import open_for_write
+
 MAGIC = 0x62A14E45
 VERSION = 1
 
+# 常见向量/矩阵长度的预编译打包器（Vector2/3/4、4x3 矩阵、4x4 矩阵）
+_FLOAT_PACKERS = {n: struct.Struct(f"<{n}f").pack for n in (2, 3, 4, 12, 16)}
+
+
+def _pack_floats(values) -> bytes:
+    """一次性打包 float 序列（避免逐元素 struct.pack）"""
+    pack = _FLOAT_PACKERS.get(len(values))
+    if pack is None:
+        return struct.pack(f"<{len(values)}f", *values)
+    return pack(*values)
+
 
 @dataclass
 class PackedNode:
@@ -74,9 +87,12 @@ class PackedSectionWriter:
         if isinstance(v, str):
             return v.encode("utf-8") + b"\x00"
         if isinstance(v, (list, tuple)):
+            # 矩阵：按行展开为一维（row-major）
+            if v and isinstance(v[0], (list, tuple)):
+                v = [x for row in v for x in row]
             # 向量/矩阵
             if all(isinstance(x, (int, float)) for x in v):
-                return b"".join(struct.pack("<f", float(x)) for x in v)
+                return _pack_floats(v)
         raise TypeError(f"Unsupported value type: {type(v)}")
 
     # ---------------------------
@@ -84,7 +100,7 @@ class PackedSectionWriter:
     # ---------------------------
 
     def write(self):
-        with open(self.filepath, "wb") as f:
+        with open_for_write(self.filepath, "wb") as f:
             # 1. magic + version
             f.write(struct.pack("<I", MAGIC))
             f.write(struct.pack("<B", VERSION))
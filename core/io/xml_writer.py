@@ -12,6 +12,8 @@
 from typing import Any, List, Tuple, Optional
 from dataclasses import dataclass, field
 
+from .buffering import open_for_write
+
 
 @dataclass
 class DataSectionNode:
@@ -57,7 +59,7 @@ class DataSectionWriter:
         if self.root is None:
             raise ValueError("Root node not created")
         
-        with open(self.filepath, 'w', encoding='utf-8', newline='\n') as f:
+        with open_for_write(self.filepath, 'w', encoding='utf-8', newline='\n') as f:
             self._write_node(f, self.root, level=0)
     
     def _write_node(self, f, node: DataSectionNode, level: int) -> None:
@@ -119,6 +121,17 @@ def format_vector3(v: Tuple[float, float, float]) -> str:
     return f"{format_float(v[0])} {format_float(v[1])} {format_float(v[2])}"
 
 
+# 4x3 单位矩阵（Scene Root、未绑定 Empty 的硬点共用同一个对象）
+# 写出时直接使用预先格式化好的行，跳过逐元素格式化
+IDENTITY_MATRIX_4X3 = (
+    (1.0, 0.0, 0.0),
+    (0.0, 1.0, 0.0),
+    (0.0, 0.0, 1.0),
+    (0.0, 0.0, 0.0),
+)
+_IDENTITY_ROW_VALUES = tuple(format_vector3(row) for row in IDENTITY_MATRIX_4X3)
+
+
 def format_vector4(v: Tuple[float, float, float, float]) -> str:
     """格式化 Vector4"""
     return f"{format_float(v[0])} {format_float(v[1])} {format_float(v[2])} {format_float(v[3])}"
@@ -147,6 +160,11 @@ def create_matrix_node(tag: str, matrix: List[List[float]]) -> DataSectionNode:
     </transform>
     """
     node = DataSectionNode(tag)
+    if matrix is IDENTITY_MATRIX_4X3:
+        for i, row_value in enumerate(_IDENTITY_ROW_VALUES):
+            node.add_child(f"row{i}", row_value)
+        return node
+    
     for i in range(min(4, len(matrix))):
         row = matrix[i]
         # 只取前3列（4x3矩阵）
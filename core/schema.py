@@ -60,6 +60,16 @@ class PrimitiveGroup:
 class Primitives:
     """
     .primitives 文件数据结构（BinSection）
+    
+    顶点属性按属性分开存放（每个属性一个数组，下标为顶点号），写出时由
+    primitives_writer.pack_interleaved 整列交错打包为顶点记录。
+    各字段可以是元组列表，也可以是 NumPy 数组；PrimitivesBuilder 的输出为：
+        vertices / normals: float32 (N, 3)
+        uvs: float32 (N, 2)
+        bone_indices: int32 (N, 3)（写出时转为 uint8，超出 255 的映射到根骨骼）
+        bone_weights: uint8 (N, 2)
+        indices: uint32 (M,)
+    判断是否存在请用 len() 而不是 bool()
     """
     version: int = 1
     
@@ -88,6 +98,11 @@ class Primitives:
     
     # 顶点格式字符串（动态生成，如 "xyznuvtb"）
     vertex_format: str = ""
+    
+    @property
+    def material_slots(self) -> List[int]:
+        """各分组的材质槽索引（按分组顺序）"""
+        return [g.material_slot for g in self.groups]
 
 
 # ==================== Visual 数据结构 ====================
@@ -191,6 +206,9 @@ class AnimationKeys:
     position_keys: List[Tuple[float, Tuple[float, float, float]]] = field(default_factory=list)
     rotation_keys: List[Tuple[float, Tuple[float, float, float, float]]] = field(default_factory=list)  # Quaternion
     scale_keys: List[Tuple[float, Tuple[float, float, float]]] = field(default_factory=list)
+    # 三组关键帧共用的采样时间（按时间轴连续存放，供校验等只读时间的场合使用）
+    # 为空表示各组时间不一致，需从各组关键帧中读取
+    times: List[float] = field(default_factory=list)
 
 
 @dataclass
@@ -344,9 +362,9 @@ class Portal:
 
 # ==================== 导出设置数据结构 ====================
 
-@dataclass
+@dataclass(slots=True)
 class ExportSettings:
-    """全局导出设置（来自 Preferences）"""
+    """全局导出设置（来自 Preferences；slots 让导出过程中的字段读取走属性描述符）"""
     root_path: str = ""                 # 导出根目录 ✔
     texture_path: str = ""              # 纹理根目录 ✔
     axis_mode: CoordinateSystem = CoordinateSystem.Z_UP  # 坐标系转换 ✔
@@ -365,6 +383,17 @@ class ExportSettings:
     write_audit: bool = True            # 写入审计日志
 
 
+@dataclass(frozen=True, slots=True)
+class FileOptions:
+    """文件生成选项（导出操作符的勾选项，每次导出构造一次）"""
+    export_primitives: bool = True
+    export_visual: bool = True
+    export_animation: bool = True
+    export_model: bool = True
+    export_manifest: bool = True
+    export_audit: bool = True
+
+
 @dataclass
 class ObjectSettings:
     """对象级设置（来自 Object Panel）"""
@@ -390,8 +419,9 @@ class ManifestEntry:
     """清单条目"""
     file: str                           # 文件路径
     file_type: str                      # primitives / visual / model / animation
-    dependencies: List[str] = field(default_factory=list)
+    dependencies: Tuple[str, ...] = ()  # 依赖文件（不可变，可共享）
     hash: str = ""
+    fingerprint: str = ""               # 源数据指纹（用于增量导出）
     timestamp: str = ""
 
 
@@ -9,7 +9,13 @@
 # - LOD/目录策略：检查配置是否合理
 
 import re
-from typing import List, Tuple
+import string
+from functools import lru_cache
+from itertools import pairwise
+from operator import itemgetter, ne
+from typing import Any, FrozenSet, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 from .schema import (
     Primitives, Visual, Model, Animation,
     Skeleton, AnimationChannel, AnimationTrackEvent,
@@ -17,19 +23,51 @@ from .schema import (
 )
 
 
+# 预编译的校验正则（避免每次调用时查 re 模块缓存）
+_NAME_RE = re.compile(r'^[A-Za-z0-9_\-]+$')
+
+# 资源路径允许的字符（空格不在其中），translate 时作为删除表使用
+_PATH_BYTES = (string.ascii_letters + string.digits + "_-./").encode("ascii")
+
+# 合法目录策略集合（导入时构建一次）
+_VALID_STRATEGIES = frozenset(DirectoryStrategy)
+
+
+@lru_cache(maxsize=128)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """编译调用方传入的自定义正则（相同的模式字符串只编译一次）"""
+    return re.compile(pattern)
+
+
 # ---------------------------
 # 命名规范校验
 # ---------------------------
 
-def validate_name(name: str, pattern: str = r'^[A-Za-z0-9_\-]+$',
+def validate_name(name: str, pattern: Union[str, re.Pattern] = _NAME_RE,
                   min_len: int = 1, max_len: int = 64) -> Tuple[bool, str]:
     if not (min_len <= len(name) <= max_len):
         return False, f"长度必须在 {min_len}~{max_len} 之间"
-    if not re.match(pattern, name):
+    if isinstance(pattern, str):
+        pattern = _compile_pattern(pattern)
+    if not pattern.match(name):
         return False, f"名称包含非法字符: {name}"
     return True, "OK"
 
 
+def validate_names(names: List[str], pattern: Union[str, re.Pattern] = _NAME_RE,
+                   min_len: int = 1, max_len: int = 64) -> List[str]:
+    """
+    批量校验名称
+    
+    返回:
+        不合规的名称列表（全部合规时为空）
+    """
+    if isinstance(pattern, str):
+        pattern = _compile_pattern(pattern)
+    match = pattern.match
+    return [n for n in names if not (min_len <= len(n) <= max_len) or not match(n)]
+
+
 # ---------------------------
 # 骨骼一致性
 # ---------------------------
@@ -38,11 +76,12 @@ def validate_skeleton_consistency(model: Model, animations: List[Animation]) ->
     errors: List[str] = []
     if not model.skeleton:
         return errors
-    bone_set = set(model.skeleton.bone_names)
+    bone_set = frozenset(model.skeleton.bone_names)
     for anim in animations:
-        for ch in anim.channels:
-            if ch.bone_name not in bone_set:
-                errors.append(f"动画 {anim.name} 引用未知骨骼: {ch.bone_name}")
+        # 先求差集，只为真正缺失的骨骼格式化错误信息（通常为空）
+        missing = {ch.bone_name for ch in anim.channels} - bone_set
+        for bone_name in sorted(missing):
+            errors.append(f"动画 {anim.name} 引用未知骨骼: {bone_name}")
     return errors
 
 
@@ -56,7 +95,9 @@ def validate_group_alignment(primitives: Primitives, visual: Visual) -> List[str
         errors.append(
             f"Primitives.groups({len(primitives.groups)}) 与 Visual.materials({len(visual.materials)}) 数量不一致"
         )
-    else:
+    elif any(map(ne, primitives.material_slots, range(len(primitives.groups)))):
+        # 与 0..n-1 逐项比较（C 层完成，遇到第一处不一致即停止）；
+        # 全部一致（常见情况）时不再逐组格式化错误
         for i, g in enumerate(primitives.groups):
             if g.material_slot != i:
                 errors.append(f"Group {g.name} 的 material_slot={g.material_slot} 与索引 {i} 不一致")
@@ -67,19 +108,107 @@ def validate_group_alignment(primitives: Primitives, visual: Visual) -> List[str
 # 动画关键帧单调性
 # ---------------------------
 
+# 关键帧数超过该值时改用 NumPy 向量化检查（短序列逐个比较更快）
+_VECTORIZE_MIN_KEYS = 64
+
+# 取关键帧 (time, value) 中的时间（在 C 层完成元组取值）
+_key_time = itemgetter(0)
+
+# numba 为可选依赖（Blender 自带的 Python 不包含），不可用时使用 NumPy 检查
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _scan_times_jit(times, duration):
+        """_scan_key_times 的编译版本（输入为 float64 数组）"""
+        monotonic = True
+        in_range = True
+        prev = -np.inf
+        for i in range(times.shape[0]):
+            t = times[i]
+            if t < prev:
+                monotonic = False
+            if t < 0.0 or t > duration:
+                in_range = False
+            if not (monotonic or in_range):
+                break
+            prev = t
+        return monotonic, in_range
+else:
+    _scan_times_jit = None
+
+
+def _scan_time_array(times: np.ndarray, duration: float) -> Tuple[bool, bool]:
+    """_scan_key_times 的数组版本（times 为 float64 一维数组）"""
+    if _scan_times_jit is not None:
+        return _scan_times_jit(times, float(duration))
+    monotonic = not (np.diff(times) < 0).any()
+    in_range = not ((times < 0) | (times > duration)).any()
+    return monotonic, in_range
+
+
+def _scan_key_times(seq: Sequence[Tuple[float, Any]], duration: float) -> Tuple[bool, bool]:
+    """
+    检查关键帧时间：是否单调不减、是否全部落在 [0, duration] 内
+    单调性检查遇到第一个逆序即结束；单调时范围检查只看首尾
+    
+    返回:
+        (monotonic, in_range)
+    """
+    if len(seq) > _VECTORIZE_MIN_KEYS:
+        times = np.fromiter(map(_key_time, seq), dtype=np.float64, count=len(seq))
+        return _scan_time_array(times, duration)
+    
+    if not seq:
+        return True, True
+    monotonic = not any(b[0] < a[0] for a, b in pairwise(seq))
+    if monotonic:
+        # 单调时只需检查首尾
+        in_range = seq[0][0] >= 0 and seq[-1][0] <= duration
+    else:
+        in_range = all(0 <= t <= duration for t in map(_key_time, seq))
+    return monotonic, in_range
+
+
+def _check_key_seq(seq_name: str, seq: Sequence[Tuple[float, Any]], anim: Animation,
+                   ch: AnimationChannel, errors: List[str],
+                   scan: Optional[Tuple[bool, bool]] = None) -> None:
+    """检查一组关键帧的时间，错误追加到 errors（scan 为已得到的检查结果）"""
+    monotonic, in_range = scan if scan is not None else _scan_key_times(seq, anim.duration)
+    if not monotonic:
+        errors.append(f"动画 {anim.name} 通道 {ch.bone_name} 的 {seq_name} 时间戳非单调递增")
+    if not in_range:
+        errors.append(f"动画 {anim.name} 通道 {ch.bone_name} 的 {seq_name} 时间越界")
+
+
+def _check_channel_keys(anim: Animation, ch: AnimationChannel, errors: List[str]) -> None:
+    """检查单个通道三组关键帧的时间，错误追加到 errors"""
+    keys = ch.keys
+    tracks = (("positionKeys", keys.position_keys),
+              ("rotationKeys", keys.rotation_keys),
+              ("scaleKeys", keys.scale_keys))
+    n = len(keys.position_keys)
+    if n > _VECTORIZE_MIN_KEYS and n == len(keys.rotation_keys) == len(keys.scale_keys):
+        # 时间取自关键帧元组本身（writer 写出的就是这一列），不信任 keys.times；
+        # 三组时间完全相同时（采样导出的常见情况）只扫描一次
+        times = [np.fromiter(map(_key_time, seq), dtype=np.float64, count=n) for _, seq in tracks]
+        shared = np.array_equal(times[0], times[1]) and np.array_equal(times[0], times[2])
+        scan = _scan_time_array(times[0], anim.duration) if shared else None
+        for (name, seq), track_times in zip(tracks, times):
+            _check_key_seq(name, seq, anim, ch, errors,
+                           scan if shared else _scan_time_array(track_times, anim.duration))
+        return
+    for name, seq in tracks:
+        _check_key_seq(name, seq, anim, ch, errors)
+
+
 def validate_animation_monotonic(anim: Animation) -> List[str]:
     errors: List[str] = []
     for ch in anim.channels:
-        for seq_name, seq in [
-            ("positionKeys", ch.keys.position_keys),
-            ("rotationKeys", ch.keys.rotation_keys),
-            ("scaleKeys", ch.keys.scale_keys),
-        ]:
-            times = [t for t, _ in seq]
-            if times != sorted(times):
-                errors.append(f"动画 {anim.name} 通道 {ch.bone_name} 的 {seq_name} 时间戳非单调递增")
-            if any(t < 0 or t > anim.duration for t in times):
-                errors.append(f"动画 {anim.name} 通道 {ch.bone_name} 的 {seq_name} 时间越界")
+        _check_channel_keys(anim, ch, errors)
     return errors
 
 
@@ -88,11 +217,11 @@ def validate_animation_monotonic(anim: Animation) -> List[str]:
 # ---------------------------
 
 def validate_resource_path(path: str) -> Tuple[bool, str]:
-    pattern = r'^[A-Za-z0-9_\-./]+$'
-    if not re.match(pattern, path):
+    if not path or not path.isascii():
+        return False, f"路径非法: {path}"
+    # 删除所有合法字节后仍有剩余即为非法字符
+    if path.encode("ascii").translate(None, _PATH_BYTES):
         return False, f"路径非法: {path}"
-    if " " in path:
-        return False, f"路径包含空格: {path}"
     return True, "OK"
 
 
@@ -102,7 +231,7 @@ def validate_resource_path(path: str) -> Tuple[bool, str]:
 
 def validate_strategy(visual: Visual) -> List[str]:
     errors: List[str] = []
-    if visual.directory_strategy not in list(DirectoryStrategy):
+    if visual.directory_strategy not in _VALID_STRATEGIES:
         errors.append(f"未知目录策略: {visual.directory_strategy}")
     if visual.lod_binding:
         for g, lod in visual.lod_binding.items():
@@ -115,21 +244,59 @@ def validate_strategy(visual: Visual) -> List[str]:
 # 综合校验
 # ---------------------------
 
-def validate_all(primitives: Primitives = None,
-                 visual: Visual = None,
-                 model: Model = None,
-                 animations: List[Animation] = None) -> Tuple[List[str], List[str]]:
+def _validate_animation(anim: Animation, bone_set: Optional[FrozenSet[str]],
+                        fast_fail: bool = False) -> List[str]:
+    """
+    单次遍历完成一个动画的骨骼引用与关键帧检查，每个通道只访问一次
+    
+    参数:
+        anim: 动画数据
+        bone_set: 骨骼名称集合（模型无骨架时为 None，跳过引用检查）
+        fast_fail: 发现错误后立即返回
+    """
+    errors: List[str] = []
+    for ch in anim.channels:
+        if bone_set is not None and ch.bone_name not in bone_set:
+            errors.append(f"动画 {anim.name} 引用未知骨骼: {ch.bone_name}")
+        _check_channel_keys(anim, ch, errors)
+        if fast_fail and errors:
+            break
+    return errors
+
+
+def validate_all(primitives: Optional[Primitives] = None,
+                 visual: Optional[Visual] = None,
+                 model: Optional[Model] = None,
+                 animations: Optional[List[Animation]] = None,
+                 fast_fail: bool = False) -> Tuple[List[str], List[str]]:
+    """
+    执行全部校验
+    
+    参数:
+        fast_fail: 为 True 时在发现第一批错误后立即返回（只需判断能否导出时使用）
+    
+    返回:
+        (errors, warnings)
+    """
     errors: List[str] = []
     warnings: List[str] = []
 
+    # 没有任何可校验的数据
+    if not (primitives or visual or model or animations):
+        return errors, warnings
+
     if primitives and visual:
         errors.extend(validate_group_alignment(primitives, visual))
         errors.extend(validate_strategy(visual))
+        if fast_fail and errors:
+            return errors, warnings
 
     if model and animations:
-        errors.extend(validate_skeleton_consistency(model, animations))
+        bone_set = frozenset(model.skeleton.bone_names) if model.skeleton else None
         for anim in animations:
-            errors.extend(validate_animation_monotonic(anim))
+            errors.extend(_validate_animation(anim, bone_set, fast_fail))
+            if fast_fail and errors:
+                return errors, warnings
 
     # 命名规范检查
     if model and model.resource_id:
@@ -7,10 +7,13 @@
 # - 从 Blender Object 构建 Model
 
 import bpy
-import bmesh
+import logging
 import os
-from mathutils import Vector, Matrix
-from typing import List, Tuple, Optional
+import re
+import struct
+from functools import lru_cache
+import numpy as np
+from typing import Dict, List, Tuple, Optional
 from .core.schema import (
     Primitives,
     PrimitiveGroup,
@@ -27,6 +30,91 @@ from .core.schema import (
 )
 from .core.coordinate_converter import CoordinateConverter
 
+# 调试信息走 logging（默认不输出 DEBUG，格式化延迟到真正输出时）
+log = logging.getLogger(__name__)
+
+
+# 导入/临时文件夹前缀（贪婪匹配到最后一个 .fbm/ .blend/ .obj/ .max/ 为止）
+_TEMP_FOLDER_RE = re.compile(r".*\.(?:fbm|blend|obj|max)/", re.DOTALL)
+
+# 占位 BSP 数据的头部（magic, num_triangles, max_triangles, num_nodes）与单个节点（flags + 平面方程）
+_BSP_HEADER = struct.Struct("<4I")
+_BSP_NODE = struct.Struct("<I4f")
+
+# 顶点缓存优化（Tipsify）假定的 GPU 变换后缓存大小
+_VERTEX_CACHE_SIZE = 16
+
+# numba 为可选依赖（Blender 自带的 Python 不包含），不可用时使用 NumPy 向量化计算
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _quantize_weights_jit(indptr, groups, weights, group_to_bone, out_indices, out_weights):
+        """PrimitivesBuilder._quantize_vertex_weights 的编译版本（逐顶点插入排序取前 3）"""
+        num_groups = group_to_bone.shape[0]
+        top_weights = np.empty(3)
+        top_bones = np.empty(3, dtype=np.int32)
+        for v in range(indptr.shape[0] - 1):
+            found = 0
+            for j in range(indptr[v], indptr[v + 1]):
+                group = groups[j]
+                weight = weights[j]
+                if group >= num_groups or weight <= 0.0001:
+                    continue
+                bone = group_to_bone[group]
+                if bone < 0:
+                    continue
+                # 插入到降序位置；相同权重排在已有条目之后（与稳定排序一致）
+                k = min(found, 3)
+                while k > 0 and top_weights[k - 1] < weight:
+                    if k < 3:
+                        top_weights[k] = top_weights[k - 1]
+                        top_bones[k] = top_bones[k - 1]
+                    k -= 1
+                if k < 3:
+                    top_weights[k] = weight
+                    top_bones[k] = bone
+                found += 1
+            
+            for k in range(min(found, 3), 3):
+                top_weights[k] = 0.0
+                top_bones[k] = 0
+            total_weight = top_weights[0] + top_weights[1] + top_weights[2]
+            if found == 0 or total_weight < 0.0001:
+                # 没有有效权重的顶点绑定到 Root 骨骼
+                out_weights[v, 0] = 255
+                continue
+            
+            w0 = min(int(top_weights[0] / total_weight * 255.0), 255)
+            w1 = min(int(top_weights[1] / total_weight * 255.0), 255 - w0)
+            for k in range(3):
+                out_indices[v, k] = top_bones[k]
+            out_weights[v, 0] = w0
+            out_weights[v, 1] = w1
+else:
+    _quantize_weights_jit = None
+
+
+@lru_cache(maxsize=256)
+def _world_bbox(corners: tuple, matrix_world: tuple) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
+    """
+    包围盒角点变换到世界空间并转换到 BigWorld 坐标系后的 (min, max)
+    
+    参数为元组（可哈希）：同一物体在 Visual / Model 构建中重复计算时直接命中缓存，
+    网格或变换改变后键随之改变，不会取到旧结果
+    
+    参数:
+        corners: obj.bound_box 的 8 个角点
+        matrix_world: obj.matrix_world 的 4 行
+    """
+    # 坐标系转换是带符号的轴置换，先转换再取 min/max 与 convert_bbox 的结果相同
+    transform = CoordinateConverter.compose_transform(matrix_world)
+    points = np.array(corners, dtype=np.float64) @ transform[:3, :3].T + transform[:3, 3]
+    return (tuple((points.min(axis=0) + 0.0).tolist()), tuple((points.max(axis=0) + 0.0).tolist()))
+
 
 class PrimitivesBuilder:
     """
@@ -60,19 +148,27 @@ class PrimitivesBuilder:
                 break
         
         # 构建静态数据
-        primitives = PrimitivesBuilder._build_static_data(obj, apply_transform, unit_scale)
+        primitives, source_verts = PrimitivesBuilder._build_static_data(obj, apply_transform, unit_scale)
         
         # 构建蒙皮数据（如果需要）
         if not force_static and armature_obj:
-            print(f"DEBUG: 生成蒙皮数据 for {obj.name}")
-            PrimitivesBuilder._build_skinning_data(primitives, obj, armature_obj)
+            log.debug("生成蒙皮数据 for %s", obj.name)
+            PrimitivesBuilder._build_skinning_data(primitives, obj, armature_obj, source_verts)
         else:
-            print(f"DEBUG: 跳过蒙皮数据生成 for {obj.name} (force_static={force_static}, has_armature={armature_obj is not None})")
+            log.debug("跳过蒙皮数据生成 for %s (force_static=%s, has_armature=%s)",
+                      obj.name, force_static, armature_obj is not None)
+        
+        # 网格优化（可选）：先按分组重排三角形提升变换后缓存命中，再按使用顺序重排顶点
+        props = getattr(obj, 'bigworld_props', None)
+        if props is not None and getattr(props, 'optimize_mesh', False):
+            PrimitivesBuilder._optimize_vertex_cache(primitives)
+            PrimitivesBuilder._optimize_vertex_fetch(primitives)
         
         return primitives
     
     @staticmethod
-    def _build_static_data(obj: bpy.types.Object, apply_transform: bool, unit_scale: float) -> Primitives:
+    def _build_static_data(obj: bpy.types.Object, apply_transform: bool,
+                           unit_scale: float) -> Tuple[Primitives, np.ndarray]:
         """
         构建静态数据（所有类型公用）
         
@@ -82,93 +178,175 @@ class PrimitivesBuilder:
             unit_scale: 单位缩放
         
         返回:
-            Primitives 数据结构（只包含静态数据）
+            (primitives, source_verts)
+            primitives: Primitives 数据结构（只包含静态数据）
+            source_verts: 每个输出顶点对应的网格顶点索引（供蒙皮数据使用）
         """
-        # 创建 bmesh
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-        
-        # 三角化
-        bmesh.ops.triangulate(bm, faces=bm.faces)
+        mesh = obj.data
         
-        # 计算法线
-        bm.normal_update()
-        
-        # 获取 UV 层
-        uv_layer = bm.loops.layers.uv.active
+        # 三角化：直接使用网格的 loop 三角形（C 层数据，通过 foreach_get 批量读取，不复制为 BMesh）
+        mesh.calc_loop_triangles()
+        num_tris = len(mesh.loop_triangles)
+        tri_loops = np.empty(num_tris * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", tri_loops)
+        face_materials = np.empty(num_tris, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("material_index", face_materials)
         
         primitives = Primitives()
         
+        # 三角形按材质槽稳定排序，使每个 PrimitiveGroup 对应一段连续的索引
+        tri_order = np.argsort(face_materials, kind="stable")
+        tri_loops = tri_loops.reshape(-1, 3)[tri_order].reshape(-1)
+        
         # 使用 loop-based 顶点收集（支持 UV 分裂）
         # 这样可以正确处理同一顶点在不同面上有不同 UV 的情况
-        loop_to_index = {}  # 记录 loop -> 顶点索引的映射
-        
-        for face in bm.faces:
-            for loop in face.loops:
-                # 创建 loop 的唯一标识
-                vert = loop.vert
-                uv = loop[uv_layer].uv if uv_layer else (0.0, 0.0)
-                loop_key = (vert.index, tuple(uv))
-                
-                # 如果这个 (顶点, UV) 组合已经存在，复用索引
-                if loop_key in loop_to_index:
-                    primitives.indices.append(loop_to_index[loop_key])
-                else:
-                    # 创建新的顶点
-                    new_index = len(primitives.vertices)
-                    loop_to_index[loop_key] = new_index
-                    
-                    # 位置
-                    co = vert.co
-                    if apply_transform:
-                        co = obj.matrix_world @ co
-                    
-                    # 转换坐标系：Blender Z-up → BigWorld Y-up
-                    converted_pos = CoordinateConverter.convert_position(co)
-                    # 应用单位缩放
-                    converted_pos = (
-                        converted_pos[0] * unit_scale,
-                        converted_pos[1] * unit_scale,
-                        converted_pos[2] * unit_scale
-                    )
-                    primitives.vertices.append(converted_pos)
-                    
-                    # 法线（使用顶点的平滑法线，支持 smooth shading）
-                    # 重要：使用 vert.normal 而不是 loop.calc_normal()
-                    # vert.normal 包含了平滑着色的信息，使模型更圆润
-                    n = vert.normal
-                    if apply_transform:
-                        n = obj.matrix_world.to_3x3() @ n
-                    
-                    # 转换法线（不需要缩放）
-                    converted_normal = CoordinateConverter.convert_normal(n)
-                    primitives.normals.append(converted_normal)
-                    
-                    # UV
-                    primitives.uvs.append((uv[0], 1.0 - uv[1]))  # 翻转 V 坐标（Blender 到 BigWorld）
-                    
-                    # 蒙皮数据将在_build_skinning_data中处理
-                    
-                    # 添加索引
-                    primitives.indices.append(new_index)
+        num_loops = len(mesh.loops)
+        mesh_loop_verts = np.empty(num_loops, dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", mesh_loop_verts)
+        loop_verts = mesh_loop_verts[tri_loops]
+        
+        uv_layer = mesh.uv_layers.active
+        if uv_layer:
+            mesh_loop_uvs = np.empty(num_loops * 2, dtype=np.float32)
+            uv_layer.data.foreach_get("uv", mesh_loop_uvs)
+            loop_uvs = mesh_loop_uvs.reshape(-1, 2)[tri_loops]
+        else:
+            loop_uvs = np.zeros((loop_verts.size, 2), dtype=np.float32)
+        
+        # (顶点, UV) 组合去重，输出顶点按首次出现的顺序排列
+        source_verts, unique_uvs, indices = PrimitivesBuilder._remap_loop_vertices(loop_verts, loop_uvs)
+        primitives.indices = indices.astype(np.uint32)
+        
+        # UV：翻转 V 坐标（Blender 到 BigWorld）
+        unique_uvs = unique_uvs.astype(np.float64)
+        unique_uvs[:, 1] = 1.0 - unique_uvs[:, 1]
+        primitives.uvs = unique_uvs.astype(np.float32)
+        
+        # 蒙皮数据将在_build_skinning_data中处理
+        
+        # 位置与法线：一次性读入网格顶点数组，按 source_verts 取出后整体变换
+        # 法线使用顶点的平滑法线（支持 smooth shading），而不是逐 loop 计算的面法线
+        positions, normals = PrimitivesBuilder._read_vertex_arrays(mesh, source_verts)
+        
+        # 世界变换、坐标系转换（Blender Z-up → BigWorld Y-up）与单位缩放合并为一个矩阵，
+        # 一次矩阵乘法直接得到 BigWorld 坐标；法线只做旋转与轴置换，不缩放
+        # （加 0.0 把 -0.0 规整为 0.0，与 CoordinateConverter 的逐点转换一致）
+        world_matrix = obj.matrix_world if apply_transform else None
+        transform = CoordinateConverter.compose_transform(world_matrix, unit_scale)
+        normal_transform = CoordinateConverter.compose_transform(world_matrix)[:3, :3]
+        
+        positions = positions @ transform[:3, :3].T + (transform[:3, 3] + 0.0)
+        normals = normals @ normal_transform.T + 0.0
+        
+        primitives.vertices = positions.astype(np.float32)
+        primitives.normals = normals.astype(np.float32)
         
         # 构建 PrimitiveGroup（按材质槽分组）
-        primitives.groups = PrimitivesBuilder._build_groups(obj, bm, loop_to_index)
+        primitives.groups = PrimitivesBuilder._build_groups(obj, face_materials, len(source_verts))
         
         # 生成简单的 BSP 数据（占位）
+        primitives.bsp_data = PrimitivesBuilder._generate_bsp_data(obj, mesh)
+        
+        return primitives, source_verts
+    
+    @staticmethod
+    def _generate_bsp_data(obj: bpy.types.Object, mesh: bpy.types.Mesh) -> Optional[bytes]:
+        """
+        生成简单的 BSP 数据（占位实现）
+        
+        注意：这是一个简化的实现，主要用于增加文件大小
+        真正的 BSP 数据需要复杂的空间分割算法
+        """
         try:
-            primitives.bsp_data = PrimitivesBuilder._generate_bsp_data(obj, bm)
-        except AttributeError as e:
-            print(f"WARNING: BSP 数据生成方法不存在: {e}")
-            primitives.bsp_data = None
+            # 获取所有三角形（调用方已执行 mesh.calc_loop_triangles()）
+            num_triangles = len(mesh.loop_triangles)
+            if num_triangles == 0:
+                return None
+            
+            tri_verts = np.empty(num_triangles * 3, dtype=np.int32)
+            mesh.loop_triangles.foreach_get("vertices", tri_verts)
+            co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+            mesh.vertices.foreach_get("co", co)
+            
+            # 转换坐标系后按三角形顶点展开：每个三角形 3 个 Vector3 (9 floats)
+            positions = CoordinateConverter.convert_vector_array(co.reshape(-1, 3).astype(np.float64))
+            triangles = positions[tri_verts].astype("<f4")
+            
+            # Header (根据文档 ch30.html)
+            magic_number = 0x00505342  # "BSP" + version
+            max_triangles = num_triangles  # 简化处理
+            num_nodes = 1  # 简化处理，只有一个节点
+            
+            # 索引数量
+            num_indices = min(num_triangles, 65535)  # uint16 限制
+            
+            return b"".join((
+                _BSP_HEADER.pack(magic_number, num_triangles, max_triangles, num_nodes),
+                triangles.tobytes(),
+                # 简化的节点（占位）：flags = reserved(5) + flags(3)，平面方程 (normal + d) 为默认平面
+                _BSP_NODE.pack(0x14, 0.0, 0.0, 1.0, 0.0),
+                struct.pack("<H", num_indices),
+                # 三角形索引
+                np.arange(num_indices, dtype="<u2").tobytes(),
+            ))
+            
+        except Exception as e:
+            log.warning("BSP 数据生成失败: %s", e)
+            return None
+    
+    @staticmethod
+    def _remap_loop_vertices(loop_verts: np.ndarray, loop_uvs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        按 (顶点索引, UV) 对 loop 去重，生成顶点重映射表
         
+        UV 按 float32 的位模式精确比较（与逐个比较元组的结果相同，+0.0/-0.0 视为相同）
         
-        bm.free()
+        参数:
+            loop_verts: 每个 loop 的网格顶点索引 (L,)
+            loop_uvs: 每个 loop 的 UV (L, 2) float32
         
-        return primitives
+        返回:
+            (source_verts, uvs, indices)
+            source_verts: 每个输出顶点对应的网格顶点索引
+            uvs: 每个输出顶点的 UV
+            indices: 每个 loop 对应的输出顶点索引（即索引缓冲）
+        """
+        uv_bits = (loop_uvs + np.float32(0.0)).view(np.int32)
+        keys = np.column_stack((loop_verts, uv_bits))
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        
+        # np.unique 按键排序；改为按首次出现的顺序编号，保持原有的顶点顺序
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(order.size)
+        first_loops = first[order]
+        return loop_verts[first_loops], loop_uvs[first_loops], rank[inverse.reshape(-1)]
     
     @staticmethod
-    def _build_skinning_data(primitives: Primitives, obj: bpy.types.Object, armature_obj: bpy.types.Object) -> None:
+    def _read_vertex_arrays(mesh: bpy.types.Mesh, vertex_indices: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量读取网格顶点的位置与法线
+        
+        参数:
+            mesh: Blender 网格数据
+            vertex_indices: 需要的网格顶点索引（可重复）
+        
+        返回:
+            (positions, normals)，均为 (len(vertex_indices), 3) 的 float64 数组
+        """
+        num_verts = len(mesh.vertices)
+        co = np.empty(num_verts * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        normals = np.empty(num_verts * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("normal", normals)
+        
+        index = np.asarray(vertex_indices, dtype=np.intp)
+        return (co.reshape(-1, 3)[index].astype(np.float64),
+                normals.reshape(-1, 3)[index].astype(np.float64))
+    
+    @staticmethod
+    def _build_skinning_data(primitives: Primitives, obj: bpy.types.Object,
+                             armature_obj: bpy.types.Object, source_verts: np.ndarray) -> None:
         """
         构建蒙皮数据（蒙皮/动画专用）
         
@@ -176,29 +354,70 @@ class PrimitivesBuilder:
             primitives: Primitives 数据结构（已包含静态数据）
             obj: Blender 网格对象
             armature_obj: Armature 对象
+            source_verts: 每个输出顶点对应的网格顶点索引（见 _build_static_data）
         """
-        # 创建 bmesh 用于访问顶点
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
+        # 顶点组索引 → 骨骼索引（每个网格只查一次，避免逐顶点按名称查找骨骼）
+        group_to_bone = np.array(
+            PrimitivesBuilder._build_group_to_bone(obj, armature_obj), dtype=np.int32
+        )
         
-        # 为每个顶点生成蒙皮数据
-        for i, vert in enumerate(bm.verts):
-            if i < len(primitives.vertices):
-                bone_indices, bone_weights = PrimitivesBuilder._get_vertex_weights(
-                    obj, vert, armature_obj
-                )
-                primitives.bone_indices.append(bone_indices)
-                primitives.bone_weights.append(bone_weights)
+        # 所有顶点的 (顶点组, 权重) 收集为 CSR 形式：counts[i] 为第 i 个网格顶点的条目数
+        counts = []
+        groups = []
+        weights = []
+        for mesh_vert in obj.data.vertices:
+            vertex_groups = mesh_vert.groups
+            counts.append(len(vertex_groups))
+            for group in vertex_groups:
+                groups.append(group.group)
+                weights.append(group.weight)
+        
+        bone_indices, bone_weights = PrimitivesBuilder._quantize_vertex_weights(
+            np.array(counts, dtype=np.intp),
+            np.array(groups, dtype=np.int32),
+            np.array(weights, dtype=np.float64),
+            group_to_bone
+        )
+        
+        # 按网格顶点计算，再映射到输出顶点（UV 分裂出的顶点共享同一网格顶点的权重）
+        primitives.bone_indices = bone_indices[source_verts]
+        primitives.bone_weights = bone_weights[source_verts]
+    
+    @staticmethod
+    def _build_group_to_bone(obj: bpy.types.Object, armature_obj: bpy.types.Object) -> List[int]:
+        """
+        构建顶点组索引到骨骼索引的映射表
+        
+        参数:
+            obj: Blender 网格对象
+            armature_obj: Armature 对象
         
-        bm.free()
+        返回:
+            按顶点组索引排列的骨骼索引列表（无对应骨骼为 -1）
+        """
+        max_bone_count = len(armature_obj.data.bones)
+        bone_index_map = SkeletonBuilder.get_bone_index_map(armature_obj)
+        group_to_bone = []
+        for vertex_group in obj.vertex_groups:
+            bone_idx = bone_index_map.get(vertex_group.name, -1)
+            if bone_idx >= max_bone_count:
+                log.warning("骨骼索引 %d 超出范围 (最大: %d)", bone_idx, max_bone_count - 1)
+                # 将无效索引映射到根骨骼
+                bone_idx = 0
+            group_to_bone.append(bone_idx)
+        return group_to_bone
     
     @staticmethod
-    def _build_groups(obj: bpy.types.Object, bm: bmesh.types.BMesh, loop_to_index: dict) -> List[PrimitiveGroup]:
+    def _build_groups(obj: bpy.types.Object, face_materials: np.ndarray, num_vertices: int) -> List[PrimitiveGroup]:
         """
         构建 PrimitiveGroup 列表
         
-        注意：loop_to_index 现在是 (vert_index, uv_tuple) -> vertex_index 的映射
-        但由于我们已经在主循环中构建了索引数组，这里只需要统计即可
+        注意：索引数组已在 _build_static_data 中按材质排序构建，这里只需要统计即可
+        
+        参数:
+            obj: Blender 网格对象
+            face_materials: 每个三角形的材质槽索引
+            num_vertices: 去重后的顶点数量
         """
         groups = []
         
@@ -207,25 +426,26 @@ class PrimitivesBuilder:
             group = PrimitiveGroup(
                 name="default",
                 start_index=0,
-                num_primitives=len(bm.faces),
+                num_primitives=len(face_materials),
                 start_vertex=0,
-                num_vertices=len(loop_to_index),  # 使用 loop_to_index 的长度
+                num_vertices=num_vertices,
                 material_slot=0
             )
             groups.append(group)
             return groups
         
+        # 一次统计各材质槽的三角形数量
+        num_slots = len(obj.material_slots)
+        face_counts = np.bincount(face_materials, minlength=num_slots)[:num_slots].tolist()
+        
         # 按材质槽分组
         current_index_offset = 0
         for slot_idx, slot in enumerate(obj.material_slots):
-            # 收集该材质的面
-            faces = [f for f in bm.faces if f.material_index == slot_idx]
-            
-            if not faces:
+            num_primitives = face_counts[slot_idx]
+            if not num_primitives:
                 continue
             
             # 计算索引范围
-            num_primitives = len(faces)
             start_index = current_index_offset
             
             # 更新索引偏移（每个三角形 3 个索引）
@@ -236,7 +456,7 @@ class PrimitivesBuilder:
                 start_index=start_index,
                 num_primitives=num_primitives,
                 start_vertex=0,  # 简化：使用整个顶点缓冲区
-                num_vertices=len(loop_to_index),
+                num_vertices=num_vertices,
                 material_slot=slot_idx
             )
             groups.append(group)
@@ -244,96 +464,208 @@ class PrimitivesBuilder:
         return groups
     
     @staticmethod
-    def _get_vertex_weights(obj: bpy.types.Object, vert: bmesh.types.BMVert, 
-                           armature_obj: bpy.types.Object) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+    def _quantize_vertex_weights(counts: np.ndarray, groups: np.ndarray, weights: np.ndarray,
+                                 group_to_bone: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        获取顶点的骨骼权重（从Blender读取真实数据）
+        批量计算所有网格顶点的骨骼索引与权重
         
         参数:
-            obj: 网格对象
-            vert: BMesh 顶点
-            armature_obj: Armature 对象
+            counts: 每个顶点的顶点组条目数 (V,)
+            groups: 所有条目的顶点组索引（按顶点顺序连续存放）
+            weights: 所有条目的权重 float64
+            group_to_bone: 顶点组索引 → 骨骼索引映射（见 _build_group_to_bone）
         
         返回:
             (bone_indices, bone_weights)
-            bone_indices: 3个uint8索引
-            bone_weights: 2个uint8权重 (0-255)
+            bone_indices: (V, 3) int32，每个顶点权重最大的 3 根骨骼
+            bone_weights: (V, 2) uint8，前 2 个权重 (0-255)，第三个权重由引擎按 255 补足
         """
-        # 收集顶点的所有骨骼权重
-        vertex_groups = []
-        
-        # BMesh顶点需要通过原始mesh的顶点索引来访问权重
-        mesh_vert_index = vert.index
-        
-        # 遍历该顶点的所有顶点组
-        if mesh_vert_index < len(obj.data.vertices):
-            mesh_vert = obj.data.vertices[mesh_vert_index]
-            
-            for group in mesh_vert.groups:
-                group_idx = group.group
-                weight = group.weight
-                
-                # 获取顶点组名称
-                if group_idx < len(obj.vertex_groups):
-                    group_name = obj.vertex_groups[group_idx].name
-                    
-                    # 查找对应的骨骼索引
-                    bone_idx = SkeletonBuilder.get_bone_index(armature_obj, group_name)
-                    
-                    if bone_idx >= 0 and weight > 0.0001:
-                        vertex_groups.append((bone_idx, weight))
-        
-        # 如果没有找到任何权重，绑定到Root骨骼
-        if not vertex_groups:
-            return ((0, 0, 0), (255, 0))
-        
-        # 验证骨骼索引范围
-        max_bone_count = len(armature_obj.data.bones)
-        for bone_idx, weight in vertex_groups:
-            if bone_idx >= max_bone_count:
-                print(f"WARNING: 骨骼索引 {bone_idx} 超出范围 (最大: {max_bone_count-1})")
-                # 将无效索引映射到根骨骼
-                vertex_groups = [(0, 1.0), (0, 0.0), (0, 0.0)]
-                break
-        
-        # 按权重排序（降序），取前3个
-        vertex_groups.sort(key=lambda x: x[1], reverse=True)
-        vertex_groups = vertex_groups[:3]
-        
-        # 归一化权重
-        total_weight = sum(w for _, w in vertex_groups)
-        if total_weight < 0.0001:
-            # 权重和太小，绑定到Root
-            return ((0, 0, 0), (255, 0))
+        num_verts = counts.size
+        bone_indices = np.zeros((num_verts, 3), dtype=np.int32)
+        bone_weights = np.zeros((num_verts, 2), dtype=np.uint8)
+        if _quantize_weights_jit is not None:
+            indptr = np.zeros(num_verts + 1, dtype=np.intp)
+            np.cumsum(counts, out=indptr[1:])
+            _quantize_weights_jit(indptr, groups, weights, group_to_bone, bone_indices, bone_weights)
+            return bone_indices, bone_weights
+        
+        # 没有有效权重的顶点绑定到 Root 骨骼
+        bone_weights[:, 0] = 255
+        if num_verts == 0:
+            return bone_indices, bone_weights
+        
+        # 过滤无效条目：顶点组越界、顶点组没有对应骨骼、权重过小
+        num_groups = group_to_bone.size
+        bones = np.full(groups.size, -1, dtype=np.int32)
+        in_range = groups < num_groups
+        bones[in_range] = group_to_bone[groups[in_range]]
+        valid = (bones >= 0) & (weights > 0.0001)
+        
+        # 展开为 (V, K) 的稠密表，无效与填充位置的权重记为 -1
+        width = max(int(counts.max()), 3)
+        rows = np.repeat(np.arange(num_verts), counts)
+        cols = np.arange(groups.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        table_weights = np.full((num_verts, width), -1.0)
+        table_bones = np.zeros((num_verts, width), dtype=np.int32)
+        table_weights[rows[valid], cols[valid]] = weights[valid]
+        table_bones[rows[valid], cols[valid]] = bones[valid]
+        
+        # 按权重降序取前 3 个（稳定排序：相同权重保持原顺序）
+        order = np.argsort(-table_weights, axis=1, kind="stable")[:, :3]
+        top_weights = np.take_along_axis(table_weights, order, axis=1)
+        top_bones = np.take_along_axis(table_bones, order, axis=1)
+        present = top_weights >= 0.0
+        top_weights[~present] = 0.0
+        top_bones[~present] = 0
+        
+        # 归一化权重；权重和太小的顶点同样绑定到 Root
+        total_weight = top_weights[:, 0] + top_weights[:, 1] + top_weights[:, 2]
+        skinned = present[:, 0] & (total_weight >= 0.0001)
+        
+        # 提取前2个权重，转换为uint8 (0-255)
+        scaled = (top_weights[skinned, :2] / total_weight[skinned, None]) * 255.0
+        quantized = np.clip(np.trunc(scaled), 0, 255).astype(np.int32)
+        # 确保w1 + w2 不超过255（第三个权重会自动计算）
+        quantized[:, 1] = np.minimum(quantized[:, 1], 255 - quantized[:, 0])
         
-        # 转换为uint8 (0-255)
-        normalized_weights = []
-        for _, w in vertex_groups:
-            normalized_weights.append((w / total_weight) * 255.0)
+        bone_indices[skinned] = top_bones[skinned]
+        bone_weights[skinned] = quantized
+        return bone_indices, bone_weights
+    
+    @staticmethod
+    def _optimize_vertex_cache(primitives: Primitives, cache_size: int = _VERTEX_CACHE_SIZE):
+        """
+        按分组重排三角形，提升 GPU 变换后顶点缓存的命中率（顶点缓存优化）
         
-        # 填充到3个索引和2个权重
-        while len(vertex_groups) < 3:
-            vertex_groups.append((0, 0.0))
-            normalized_weights.append(0.0)
+        每个 PrimitiveGroup 的三角形只在自己的索引范围内重排，分组边界不变
         
-        # 提取索引
-        indices = tuple(idx for idx, _ in vertex_groups[:3])
+        参数:
+            primitives: Primitives 数据结构（原地修改 indices）
+            cache_size: 假定的缓存大小
+        """
+        indices = np.asarray(primitives.indices)
+        if indices.size == 0:
+            return
+        indices = indices.copy()
+        for group in primitives.groups:
+            start = group.start_index
+            end = start + group.num_primitives * 3
+            if group.num_primitives < 2 or end > indices.size:
+                continue
+            tris = indices[start:end].reshape(-1, 3)
+            order = PrimitivesBuilder._tipsify(tris, cache_size)
+            indices[start:end] = tris[order].reshape(-1)
+        primitives.indices = indices
+    
+    @staticmethod
+    def _tipsify(tris: np.ndarray, cache_size: int) -> np.ndarray:
+        """
+        Tipsify 三角形排序（Sander et al. 2007，线性时间）
         
-        # 提取前2个权重，转换为uint8
-        w1 = int(normalized_weights[0])
-        w2 = int(normalized_weights[1]) if len(normalized_weights) > 1 else 0
+        从一个扇心顶点出发输出其全部未输出的三角形，再从刚进入缓存的顶点中
+        选一个仍有剩余三角形且留在缓存中的顶点作为下一个扇心；
+        没有合适的顶点时回退到最近使用过的顶点，再回退到按编号扫描
         
-        # 确保权重在有效范围内
-        w1 = max(0, min(255, w1))
-        w2 = max(0, min(255, w2))
+        参数:
+            tris: (N, 3) 三角形顶点索引
+            cache_size: 假定的缓存大小
         
-        # 确保w1 + w2 不超过255（第三个权重会自动计算）
-        if w1 + w2 > 255:
-            w2 = 255 - w1
+        返回:
+            三角形的新顺序（长度 N 的索引数组）
+        """
+        # 组内顶点重新编号为 0..V-1，邻接表按 CSR 存储
+        used, local = np.unique(tris, return_inverse=True)
+        local = local.reshape(-1, 3)
+        num_verts = used.size
+        num_tris = local.shape[0]
+        
+        flat = local.reshape(-1)
+        adjacency = (np.argsort(flat, kind="stable") // 3).tolist()
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(flat, minlength=num_verts)))).tolist()
+        
+        tri_verts = local.tolist()
+        live = np.bincount(flat, minlength=num_verts).tolist()
+        cache_time = [0] * num_verts
+        emitted = [False] * num_tris
+        dead_end: List[int] = []
+        output: List[int] = []
+        
+        time = cache_size + 1
+        cursor = 1
+        fan = 0
+        while fan >= 0:
+            candidates: List[int] = []
+            for t in adjacency[offsets[fan]:offsets[fan + 1]]:
+                if emitted[t]:
+                    continue
+                for v in tri_verts[t]:
+                    dead_end.append(v)
+                    candidates.append(v)
+                    live[v] -= 1
+                    if time - cache_time[v] > cache_size:
+                        cache_time[v] = time
+                        time += 1
+                emitted[t] = True
+                output.append(t)
+            
+            # 下一个扇心：在缓存中停留最久、且输出其剩余三角形后仍不会被挤出缓存的候选顶点
+            fan = -1
+            best_priority = -1
+            for v in candidates:
+                if live[v] <= 0:
+                    continue
+                age = time - cache_time[v]
+                priority = age if age + 2 * live[v] <= cache_size else 0
+                if priority > best_priority:
+                    fan = v
+                    best_priority = priority
+            
+            if fan < 0:
+                while dead_end:
+                    v = dead_end.pop()
+                    if live[v] > 0:
+                        fan = v
+                        break
+            if fan < 0:
+                while cursor < num_verts:
+                    if live[cursor] > 0:
+                        fan = cursor
+                        break
+                    cursor += 1
+        
+        return np.asarray(output, dtype=np.intp)
+    
+    @staticmethod
+    def _optimize_vertex_fetch(primitives: Primitives):
+        """
+        按顶点在索引数组中首次出现的顺序重排顶点（顶点读取优化）
         
-        weights = (w1, w2)
+        三角形顺序与分组不变，只重新编号顶点，并同步重排所有逐顶点数据（包括蒙皮数据）。
+        所有分组的顶点范围都覆盖全部顶点，因此重排不影响分组。
         
-        return (indices, weights)
+        参数:
+            primitives: Primitives 数据结构（原地修改）
+        """
+        num_verts = len(primitives.vertices)
+        indices = np.asarray(primitives.indices)
+        if num_verts == 0 or indices.size == 0:
+            return
+        
+        # 被引用的顶点按首次使用位置排序，未被引用的顶点放在最后
+        used, first_use = np.unique(indices, return_index=True)
+        order = used[np.argsort(first_use, kind="stable")]
+        if order.size < num_verts:
+            order = np.concatenate([order, np.setdiff1d(np.arange(num_verts), used)])
+        
+        remap = np.empty(num_verts, dtype=np.uint32)
+        remap[order] = np.arange(num_verts, dtype=np.uint32)
+        primitives.indices = remap[indices]
+        
+        for attr in ('vertices', 'normals', 'uvs', 'tangents', 'binormals', 'colors',
+                     'bone_indices', 'bone_weights'):
+            stream = getattr(primitives, attr)
+            if len(stream) == num_verts:
+                setattr(primitives, attr, np.asarray(stream)[order])
 
 
 class VisualBuilder:
@@ -371,7 +703,7 @@ class VisualBuilder:
         
         # 计算包围体
         visual.bounding_box = VisualBuilder._compute_bbox(obj)
-        visual.bounding_sphere = VisualBuilder._compute_bsphere(obj)
+        visual.bounding_sphere = VisualBuilder._compute_bsphere(obj, visual.bounding_box)
         
         # 添加骨骼节点（如果有）
         if skeleton and skeleton.bones:
@@ -402,44 +734,28 @@ class VisualBuilder:
         return material
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _normalize_texture_path(blender_path: str) -> str:
         """
         标准化纹理路径为BigWorld格式
         
         将Blender的纹理路径转换为相对于res目录的路径（包含扩展名）
+        同一纹理通常被多个材质引用，结果按路径缓存
         
         注意：这个方法需要在VisualBuilder中被调用，并传入root_path进行正确的相对路径计算
         这里只做基本的路径清理
         """
-        import os
-        
         if not blender_path:
             return ""
         
-        # 移除Blender的相对路径标记"//"
-        if blender_path.startswith("//"):
-            blender_path = blender_path[2:]
-        
-        # 转换为正斜杠
-        blender_path = blender_path.replace("\\", "/")
-        
-        # 移除.fbm等导入文件夹
-        if ".fbm/" in blender_path:
-            # 只保留文件名
-            blender_path = blender_path.split(".fbm/")[-1]
+        # 移除Blender的相对路径标记"//"，并转换为正斜杠
+        blender_path = blender_path.removeprefix("//").replace("\\", "/")
         
-        # 移除其他常见的临时文件夹
-        for temp_folder in [".blend/", ".obj/", ".max/"]:
-            if temp_folder in blender_path:
-                blender_path = blender_path.split(temp_folder)[-1]
-        
-        # 确保使用正斜杠
-        blender_path = blender_path.replace("\\", "/")
+        # 移除.fbm等导入文件夹及其他常见的临时文件夹（只保留最后一个临时文件夹之后的部分）
+        blender_path = _TEMP_FOLDER_RE.sub("", blender_path, count=1)
         
         # 移除开头的斜杠
-        blender_path = blender_path.lstrip("/")
-        
-        return blender_path
+        return blender_path.lstrip("/")
     
     @staticmethod
     def _compute_bbox(obj: bpy.types.Object) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
@@ -447,24 +763,15 @@ class VisualBuilder:
         if obj.type != 'MESH':
             return ((0, 0, 0), (0, 0, 0))
         
-        bbox = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
-        
-        min_x = min(v.x for v in bbox)
-        min_y = min(v.y for v in bbox)
-        min_z = min(v.z for v in bbox)
-        
-        max_x = max(v.x for v in bbox)
-        max_y = max(v.y for v in bbox)
-        max_z = max(v.z for v in bbox)
-        
-        # 应用坐标系转换
-        blender_bbox = ((min_x, min_y, min_z), (max_x, max_y, max_z))
-        return CoordinateConverter.convert_bbox(blender_bbox)
+        # 8 个角点一次矩阵乘法完成变换
+        return _world_bbox(tuple(map(tuple, obj.bound_box)), tuple(map(tuple, obj.matrix_world)))
     
     @staticmethod
-    def _compute_bsphere(obj: bpy.types.Object) -> Tuple[Tuple[float, float, float], float]:
-        """计算包围球"""
-        min_pt, max_pt = VisualBuilder._compute_bbox(obj)
+    def _compute_bsphere(obj: bpy.types.Object,
+                         bbox: Optional[Tuple[Tuple[float, float, float], Tuple[float, float, float]]] = None
+                         ) -> Tuple[Tuple[float, float, float], float]:
+        """计算包围球（传入已计算的包围盒时直接使用）"""
+        min_pt, max_pt = bbox if bbox is not None else VisualBuilder._compute_bbox(obj)
         
         center_x = (min_pt[0] + max_pt[0]) / 2
         center_y = (min_pt[1] + max_pt[1]) / 2
@@ -483,7 +790,8 @@ class ModelBuilder:
     """
     
     @staticmethod
-    def build(obj: bpy.types.Object, visual_path: str, has_skeleton: bool = False) -> Model:
+    def build(obj: bpy.types.Object, visual_path: str, has_skeleton: bool = False,
+              bounding_box: Optional[Tuple[Tuple[float, float, float], Tuple[float, float, float]]] = None) -> Model:
         """
         构建 Model 数据
         
@@ -491,6 +799,7 @@ class ModelBuilder:
             obj: Blender 对象
             visual_path: .visual 文件路径
             has_skeleton: 是否有骨骼（决定使用 nodefullVisual 还是 nodelessVisual）
+            bounding_box: 已计算的包围盒（如 Visual.bounding_box），为 None 时从对象重新计算
         
         返回:
             Model 数据结构
@@ -509,8 +818,8 @@ class ModelBuilder:
         # 标记是否有骨骼（用于 model_writer 判断使用哪个标签）
         model.has_skeleton = has_skeleton
         
-        # 包围体
-        model.bounding_box = VisualBuilder._compute_bbox(obj)
+        # 包围体（与 Visual 相同，已计算时直接复用）
+        model.bounding_box = bounding_box if bounding_box is not None else VisualBuilder._compute_bbox(obj)
         
         # 计算 extent (LOD 距离，基于包围盒的最大半径)
         min_pt, max_pt = model.bounding_box
@@ -548,109 +857,6 @@ class ModelBuilder:
         return model
 
 
-class AnimationBuilder:
-    """
-    从 Blender Armature/Action 构建 Animation 数据（占位保留）
-    """
-    
-    @staticmethod
-    def build(armature: bpy.types.Object, action: bpy.types.Action) -> Animation:
-        """
-        构建 Animation 数据
-        
-        参数:
-            armature: Blender 骨架对象
-            action: Blender 动作
-        
-        返回:
-            Animation 数据结构
-        """
-        animation = Animation()
-        
-        # 基础信息
-        animation.name = action.name
-        animation.skeleton_ref = armature.name
-        animation.duration = (action.frame_range[1] - action.frame_range[0]) / bpy.context.scene.render.fps
-        
-        # TODO: 采样关键帧
-        # 这是一个复杂的过程，需要：
-        # 1. 遍历所有骨骼
-        # 2. 采样每根骨骼的位置/旋转/缩放
-        # 3. 转换坐标系
-        
-        return animation
-    
-    @staticmethod
-    def _generate_bsp_data(obj: bpy.types.Object, bm: bmesh.types.BMesh) -> Optional[bytes]:
-        """
-        生成简单的 BSP 数据（占位实现）
-        
-        注意：这是一个简化的实现，主要用于增加文件大小
-        真正的 BSP 数据需要复杂的空间分割算法
-        """
-        import struct
-        
-        try:
-            # 获取所有三角形
-            triangles = []
-            for face in bm.faces:
-                if len(face.verts) == 3:  # 只处理三角形
-                    triangle = []
-                    for vert in face.verts:
-                        # 转换坐标系
-                        pos = CoordinateConverter.convert_position(vert.co)
-                        triangle.extend(pos)
-                    triangles.append(triangle)
-            
-            if not triangles:
-                return None
-            
-            # 简化的 BSP 数据结构
-            bsp_data = bytearray()
-            
-            # Header (根据文档 ch30.html)
-            magic_number = 0x00505342  # "BSP" + version
-            num_triangles = len(triangles)
-            max_triangles = num_triangles  # 简化处理
-            num_nodes = 1  # 简化处理，只有一个节点
-            
-            bsp_data.extend(struct.pack("<I", magic_number))
-            bsp_data.extend(struct.pack("<I", num_triangles))
-            bsp_data.extend(struct.pack("<I", max_triangles))
-            bsp_data.extend(struct.pack("<I", num_nodes))
-            
-            # Triangles
-            for triangle in triangles:
-                # 每个三角形 3 个 Vector3 (9 floats)
-                for i in range(9):
-                    bsp_data.extend(struct.pack("<f", triangle[i]))
-            
-            # 简化的节点（占位）
-            node_flags = 0x14  # reserved(5) + flags(3)
-            bsp_data.extend(struct.pack("<I", node_flags))
-            
-            # 平面方程 (normal + d)
-            plane_normal = [0.0, 0.0, 1.0]  # 默认平面
-            plane_d = 0.0
-            for i in range(3):
-                bsp_data.extend(struct.pack("<f", plane_normal[i]))
-            bsp_data.extend(struct.pack("<f", plane_d))
-            
-            # 索引数量
-            num_indices = min(num_triangles, 65535)  # uint16 限制
-            bsp_data.extend(struct.pack("<H", num_indices))
-            
-            # 三角形索引
-            for i in range(num_indices):
-                bsp_data.extend(struct.pack("<H", i))
-            
-            return bytes(bsp_data)
-            
-        except Exception as e:
-            print(f"WARNING: BSP 数据生成失败: {e}")
-            return None
-
-
 class SkeletonBuilder:
     """
     从 Blender Armature 构建骨骼结构
@@ -676,11 +882,12 @@ class SkeletonBuilder:
         
         armature = armature_obj.data
         
+        # 一次性计算所有骨骼的局部变换矩阵（Blender坐标系），再整体转换为 BigWorld 格式
+        local_matrices = SkeletonBuilder._compute_local_matrices(armature.bones)
+        bind_matrices = SkeletonBuilder._get_bone_local_matrices(local_matrices)
+        
         # 收集所有骨骼，构建完整的层级结构
-        for bone in armature.bones:
-            # 获取骨骼的局部变换矩阵
-            matrix = SkeletonBuilder._get_bone_local_matrix(bone)
-            
+        for bone, matrix in zip(armature.bones, bind_matrices):
             skeleton_bone = SkeletonBone(
                 name=bone.name,
                 parent=bone.parent.name if bone.parent else None,
@@ -697,56 +904,104 @@ class SkeletonBuilder:
                 break
         
         # 调试输出骨骼层级
-        print(f"=== 骨骼层级调试 ===")
-        print(f"总骨骼数: {len(skeleton.bones)}")
-        root_count = sum(1 for b in skeleton.bones if b.parent is None)
-        print(f"根骨骼数量: {root_count}")
-        print(f"根骨骼名称: {skeleton.root}")
-        # 显示前5个骨骼的父子关系
-        for i, bone in enumerate(skeleton.bones[:5]):
-            print(f"  骨骼[{i}]: {bone.name} -> 父: {bone.parent if bone.parent else 'None'}")
-        if len(skeleton.bones) > 5:
-            print(f"  ... (还有{len(skeleton.bones)-5}个骨骼)")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("=== 骨骼层级调试 ===")
+            log.debug("总骨骼数: %d", len(skeleton.bones))
+            root_count = sum(1 for b in skeleton.bones if b.parent is None)
+            log.debug("根骨骼数量: %d", root_count)
+            log.debug("根骨骼名称: %s", skeleton.root)
+            # 显示前5个骨骼的父子关系
+            for i, bone in enumerate(skeleton.bones[:5]):
+                log.debug("  骨骼[%d]: %s -> 父: %s", i, bone.name, bone.parent if bone.parent else 'None')
+            if len(skeleton.bones) > 5:
+                log.debug("  ... (还有%d个骨骼)", len(skeleton.bones) - 5)
         
         return skeleton
     
     @staticmethod
-    def _get_bone_local_matrix(bone: bpy.types.Bone) -> List[List[float]]:
+    def _compute_local_matrices(bones) -> np.ndarray:
         """
-        获取骨骼的局部变换矩阵（相对于父骨骼）
+        批量计算骨骼的局部变换矩阵（相对于父骨骼）
+        
+        所有 matrix_local 一次性读入 (N, 4, 4) 数组并批量求逆，
+        避免逐骨骼调用 Matrix.inverted()
         
         参数:
-            bone: Blender Bone
+            bones: Armature 的骨骼集合
         
         返回:
-            4x3矩阵（BigWorld格式，已转换坐标系）
+            按骨骼顺序排列的 (N, 4, 4) 局部矩阵数组（Blender坐标系）
         """
-        from mathutils import Matrix
+        num_bones = len(bones)
+        if num_bones == 0:
+            return np.zeros((0, 4, 4))
+        
+        rest_matrices = np.fromiter(
+            (v for bone in bones for row in bone.matrix_local for v in row),
+            dtype=np.float64, count=num_bones * 16
+        ).reshape(num_bones, 4, 4)
+        
+        bone_indices = {bone.name: i for i, bone in enumerate(bones)}
+        parent_indices = np.array(
+            [bone_indices[bone.parent.name] if bone.parent else -1 for bone in bones],
+            dtype=np.intp
+        )
+        
+        # 根骨骼直接使用 matrix_local
+        local_matrices = rest_matrices.copy()
+        
+        # 子骨骼：parent.matrix_local⁻¹ @ bone.matrix_local
+        has_parent = parent_indices >= 0
+        if has_parent.any():
+            # 只对不同的父矩阵求逆：同一父骨骼的多个子骨骼、内容完全相同的父矩阵都只算一次
+            parent_rest = rest_matrices[parent_indices[has_parent]].reshape(-1, 16)
+            unique_rest, unique_slots = np.unique(parent_rest, axis=0, return_inverse=True)
+            inverse_matrices = SkeletonBuilder._invert_rest_matrices(unique_rest.reshape(-1, 4, 4))
+            local_matrices[has_parent] = inverse_matrices[unique_slots.reshape(-1)] @ rest_matrices[has_parent]
+        
+        return local_matrices
+    
+    @staticmethod
+    def _invert_rest_matrices(matrices: np.ndarray) -> np.ndarray:
+        """
+        批量求逆骨骼静止矩阵
         
-        # 获取骨骼的局部矩阵（Blender坐标系）
-        if bone.parent:
-            # 相对于父骨骼的变换
-            local_matrix = bone.parent.matrix_local.inverted() @ bone.matrix_local
-        else:
-            # 根骨骼，使用世界矩阵
-            local_matrix = bone.matrix_local
+        骨骼的 matrix_local 是刚体变换（旋转 + 位移，无缩放/切变），
+        逆矩阵为 [Rᵀ | -Rᵀ·t]，只需转置，不做通用 4x4 求逆；
+        旋转部分不正交时（数据异常）退回 np.linalg.inv
+        
+        参数:
+            matrices: (N, 4, 4) 矩阵数组
         
-        # 应用坐标系转换：Blender Z-up → BigWorld Y-up
-        from .core.coordinate_converter import CoordinateConverter
+        返回:
+            (N, 4, 4) 逆矩阵数组
+        """
+        rotations = matrices[:, :3, :3]
+        rotations_t = rotations.transpose(0, 2, 1)
         
-        # 转换完整的4x4矩阵
-        converted_matrix_4x4 = CoordinateConverter.convert_matrix(local_matrix)
+        if not np.allclose(rotations @ rotations_t, np.eye(3), atol=1e-4):
+            return np.linalg.inv(matrices)
+        
+        inverse = np.zeros_like(matrices)
+        inverse[:, :3, :3] = rotations_t
+        inverse[:, :3, 3] = -(rotations_t @ matrices[:, :3, 3:4])[:, :, 0]
+        inverse[:, 3, 3] = 1.0
+        return inverse
+    
+    @staticmethod
+    def _get_bone_local_matrices(local_matrices: np.ndarray) -> List[List[List[float]]]:
+        """
+        将骨骼的局部变换矩阵批量转换为 BigWorld 格式
         
-        # BigWorld使用4x3矩阵（3列旋转+1列位移）
-        # 注意：Y轴（row3的第二个值）需要反向，因为骨骼和顶点的Y轴处理不同
-        matrix_4x3 = [
-            [converted_matrix_4x4[0][0], converted_matrix_4x4[0][1], converted_matrix_4x4[0][2]],
-            [converted_matrix_4x4[1][0], converted_matrix_4x4[1][1], converted_matrix_4x4[1][2]],
-            [converted_matrix_4x4[2][0], converted_matrix_4x4[2][1], converted_matrix_4x4[2][2]],
-            [converted_matrix_4x4[0][3], -converted_matrix_4x4[1][3], converted_matrix_4x4[2][3]]  # Y轴反向
-        ]
+        参数:
+            local_matrices: (N, 4, 4) 局部矩阵（Blender坐标系，见 _compute_local_matrices）
         
-        return matrix_4x3
+        返回:
+            每根骨骼一个 4x3矩阵（BigWorld格式，已转换坐标系）
+        """
+        # 应用坐标系转换：Blender Z-up → BigWorld Y-up，并直接排布为 BigWorld 4x3 矩阵（3列旋转+1列位移）
+        # 注意：Y轴位移需要反向，因为骨骼和顶点的Y轴处理不同
+        return CoordinateConverter.convert_matrix_4x3_array(local_matrices, negate_translation_y=True).tolist()
     
     @staticmethod
     def _get_bone_path(bone: bpy.types.Bone) -> str:
@@ -785,14 +1040,26 @@ class SkeletonBuilder:
         返回:
             骨骼索引，如果不存在返回 -1
         """
+        return SkeletonBuilder.get_bone_index_map(armature_obj).get(bone_name, -1)
+    
+    @staticmethod
+    def get_bone_index_map(armature_obj: bpy.types.Object) -> Dict[str, int]:
+        """
+        获取骨骼名称到索引的映射
+        
+        需要查找多根骨骼时先取映射再逐个查，避免每次查找都线性扫描骨骼列表
+        映射不做全局缓存：骨骼可能在两次导出之间被重命名或增删
+        
+        参数:
+            armature_obj: Armature 对象
+        
+        返回:
+            {骨骼名称: 索引}，不是 Armature 时为空
+        """
         if not armature_obj or armature_obj.type != 'ARMATURE':
-            return -1
+            return {}
         
-        bone_names = [bone.name for bone in armature_obj.data.bones]
-        try:
-            return bone_names.index(bone_name)
-        except ValueError:
-            return -1
+        return {bone.name: i for i, bone in enumerate(armature_obj.data.bones)}
 
 
 class AnimationBuilder:
@@ -846,43 +1113,43 @@ class AnimationBuilder:
         armature_obj.animation_data.action = action
         
         try:
-            # 为每根骨骼采样
-            for pose_bone in armature_obj.pose.bones:
-                bone_name = SkeletonBuilder._get_bone_path(pose_bone.bone)
-                bone_index = SkeletonBuilder.get_bone_index(armature_obj, pose_bone.bone.name)
-                
+            bone_index_map = SkeletonBuilder.get_bone_index_map(armature_obj)
+            pose_bones = list(armature_obj.pose.bones)
+            frames = range(frame_start, frame_end + 1)
+            times = [(frame - frame_start) / fps for frame in frames]
+            
+            # 采样结果按 (骨骼, 帧) 存入数组
+            num_bones = len(pose_bones)
+            num_frames = len(times)
+            locations = np.empty((num_bones, num_frames, 3), dtype=np.float32)
+            rotations = np.empty((num_bones, num_frames, 4), dtype=np.float32)  # (W, X, Y, Z)
+            scales = np.empty((num_bones, num_frames, 3), dtype=np.float32)
+            
+            if AnimationBuilder._can_evaluate_fcurves(armature_obj, pose_bones):
+                # 快速路径：直接对 F-Curve 求值，不切换场景帧
+                AnimationBuilder._sample_fcurves(action, pose_bones, frames, locations, rotations, scales)
+            else:
+                AnimationBuilder._sample_frames(pose_bones, frames, locations, rotations, scales)
+            
+            # 坐标系转换：所有骨骼、所有帧一次完成
+            positions = CoordinateConverter.convert_vector_array(
+                locations.reshape(-1, 3).astype(np.float64)
+            ).reshape(num_bones, num_frames, 3)
+            rotations = CoordinateConverter.convert_quaternion_array(rotations)
+            
+            for bone_idx, pose_bone in enumerate(pose_bones):
                 channel = AnimationChannel(
-                    bone_name=bone_name,
-                    bone_index=bone_index,
+                    bone_name=SkeletonBuilder._get_bone_path(pose_bone.bone),
+                    bone_index=bone_index_map.get(pose_bone.bone.name, -1),
                     keys=AnimationKeys()
                 )
+                keys = channel.keys
+                keys.times = list(times)
                 
-                # 采样关键帧
-                for frame in range(frame_start, frame_end + 1):
-                    bpy.context.scene.frame_set(frame)
-                    bpy.context.view_layer.update()  # 强制更新
-                    
-                    time = (frame - frame_start) / fps
-                    
-                    # 位置（局部空间，相对于父骨骼）
-                    pos = pose_bone.location.copy()
-                    # 坐标系转换
-                    pos_bw = CoordinateConverter.convert_position(pos)
-                    channel.keys.position_keys.append((time, pos_bw))
-                    
-                    # 旋转（四元数）
-                    if pose_bone.rotation_mode == 'QUATERNION':
-                        rot = pose_bone.rotation_quaternion.copy()
-                    else:
-                        rot = pose_bone.rotation_euler.to_quaternion()
-                    
-                    # 坐标系转换（四元数）
-                    rot_bw = CoordinateConverter.convert_quaternion(rot)
-                    channel.keys.rotation_keys.append((time, rot_bw))
-                    
-                    # 缩放（通常不需要坐标系转换）
-                    scale = pose_bone.scale.copy()
-                    channel.keys.scale_keys.append((time, tuple(scale)))
+                # 只在最后构建关键帧时转为 (时间, 值) 元组
+                keys.position_keys = [(t, tuple(pos)) for t, pos in zip(times, positions[bone_idx].tolist())]
+                keys.rotation_keys = [(t, tuple(rot)) for t, rot in zip(times, rotations[bone_idx].tolist())]
+                keys.scale_keys = [(t, tuple(scale)) for t, scale in zip(times, scales[bone_idx].tolist())]
                 
                 animation.channels.append(channel)
         
@@ -894,4 +1161,120 @@ class AnimationBuilder:
         
         return animation
 
+    @staticmethod
+    def _sample_frames(pose_bones, frames: range, locations: np.ndarray,
+                       rotations: np.ndarray, scales: np.ndarray):
+        """
+        逐帧切换场景帧采样骨骼通道（适用于任何动画设置）
+        
+        参数:
+            pose_bones: 姿态骨骼列表
+            frames: 采样帧
+            locations / rotations / scales: (B, F, 3/4/3) 输出数组
+        """
+        # 外层按帧，每帧只切换一次场景帧并更新一次，再读取所有骨骼
+        # frame_set 已按新帧求值；之后只刷新依赖图中仍被标记的部分，不强制整个视图层重新求值
+        scene = bpy.context.scene
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        for frame_idx, frame in enumerate(frames):
+            scene.frame_set(frame)
+            depsgraph.update()
+            
+            for bone_idx, pose_bone in enumerate(pose_bones):
+                # 位置（局部空间，相对于父骨骼）
+                locations[bone_idx, frame_idx] = pose_bone.location
+                
+                # 旋转（四元数）
+                if pose_bone.rotation_mode == 'QUATERNION':
+                    rotations[bone_idx, frame_idx] = pose_bone.rotation_quaternion
+                else:
+                    rotations[bone_idx, frame_idx] = pose_bone.rotation_euler.to_quaternion()
+                
+                # 缩放（通常不需要坐标系转换）
+                scales[bone_idx, frame_idx] = pose_bone.scale
+    
+    @staticmethod
+    def _can_evaluate_fcurves(armature_obj: bpy.types.Object, pose_bones) -> bool:
+        """
+        判断骨骼通道能否直接由 Action 的 F-Curve 求值得到
+        
+        欧拉角/轴角旋转需要按旋转模式换算，驱动器、NLA 与动作混合会改变通道的最终值，
+        这些情况都退回逐帧采样
+        """
+        if any(pose_bone.rotation_mode != 'QUATERNION' for pose_bone in pose_bones):
+            return False
+        
+        anim_data = armature_obj.animation_data
+        if len(anim_data.drivers) > 0:
+            return False
+        if anim_data.use_nla and any(not track.mute for track in anim_data.nla_tracks):
+            return False
+        return anim_data.action_influence == 1.0 and anim_data.action_blend_type == 'REPLACE'
+    
+    @staticmethod
+    def _sample_fcurves(action: bpy.types.Action, pose_bones, frames: range, locations: np.ndarray,
+                        rotations: np.ndarray, scales: np.ndarray):
+        """
+        直接对 F-Curve 求值得到骨骼通道（不切换场景帧，耗时只与曲线和关键帧数量有关）
+        
+        没有 F-Curve 的分量保持姿态骨骼的当前值，与逐帧采样时不被动作改变的效果一致
+        
+        参数:
+            action: Blender Action
+            pose_bones: 姿态骨骼列表（均为四元数旋转模式）
+            frames: 采样帧
+            locations / rotations / scales: (B, F, 3/4/3) 输出数组
+        """
+        fcurves = {(fcurve.data_path, fcurve.array_index): fcurve
+                   for fcurve in action.fcurves if not fcurve.mute}
+        frame_values = np.arange(frames.start, frames.stop, dtype=np.float64)
+        channels = (("location", locations), ("rotation_quaternion", rotations), ("scale", scales))
+        
+        for bone_idx, pose_bone in enumerate(pose_bones):
+            prefix = pose_bone.path_from_id()
+            for prop, samples in channels:
+                samples[bone_idx] = getattr(pose_bone, prop)
+                for axis in range(samples.shape[2]):
+                    fcurve = fcurves.get((f"{prefix}.{prop}", axis))
+                    if fcurve is not None:
+                        samples[bone_idx, :, axis] = AnimationBuilder._evaluate_fcurve(fcurve, frame_values)
+    
+    @staticmethod
+    def _evaluate_fcurve(fcurve: bpy.types.FCurve, frames: np.ndarray) -> np.ndarray:
+        """
+        在多个帧上对 F-Curve 求值
+        
+        只有线性/常量插值、常量外插且没有修改器的曲线用 NumPy 直接插值，
+        其余（贝塞尔等）逐帧调用 fcurve.evaluate，结果与动画系统一致
+        
+        参数:
+            fcurve: F-Curve
+            frames: 帧数组 float64
+        
+        返回:
+            (F,) float64 数组
+        """
+        keyframe_points = fcurve.keyframe_points
+        num_keys = len(keyframe_points)
+        interpolations = [point.interpolation for point in keyframe_points]
+        
+        if (num_keys == 0 or len(fcurve.modifiers) > 0 or fcurve.extrapolation != 'CONSTANT'
+                or not set(interpolations) <= {'LINEAR', 'CONSTANT'}):
+            return np.fromiter((fcurve.evaluate(frame) for frame in frames), dtype=np.float64, count=frames.size)
+        
+        co = np.empty(num_keys * 2, dtype=np.float64)
+        keyframe_points.foreach_get("co", co)
+        key_frames = co[0::2]
+        key_values = co[1::2]
+        
+        values = np.interp(frames, key_frames, key_values)
+        
+        # 常量插值的区段保持区段起点关键帧的值
+        constant = np.array([mode == 'CONSTANT' for mode in interpolations])
+        if constant.any():
+            segment = np.clip(np.searchsorted(key_frames, frames, side="right") - 1, 0, num_keys - 1)
+            hold = constant[segment] & (frames >= key_frames[0])
+            values[hold] = key_values[segment[hold]]
+        return values
+
 
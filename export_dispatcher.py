@@ -6,9 +6,13 @@
 # - 碰撞体: .collision → .model (可选) → manifest/audit ◆ 占位保留
 # - 门户: .visual → .model → manifest/audit ◆ 占位保留
 
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache, partial
+from dataclasses import dataclass
 import os
+import threading
 from .core.schema import (
     ExportSettings,
     ObjectSettings,
@@ -16,17 +20,89 @@ from .core.schema import (
     Primitives,
     Visual,
     Model,
+    ModelAnimation,
     Animation
 )
 from .utils.logger import Logger
 from .utils.path_resolver import PathResolver
 from .writers.audit_writer import AuditLogger, ErrorCode
-from .writers.manifest_writer import ManifestWriter
+from .writers.manifest_writer import ManifestWriter, compute_fingerprint
+from .writers.primitives_writer import write_primitives
+from .writers.visual_writer import VisualWriter
+from .writers.model_writer import write_model
+from .writers.animation_writer import write_animation
 from .builders.model.hardpoint_builder import HardpointBuilder
 from .builders.model.action_builder import ActionBuilder
 from .config.export_settings import ObjectExportSettings
 
 
+@lru_cache(maxsize=4096)
+def _relative_to_root(filepath: str, root_path: str) -> str:
+    """
+    计算文件路径相对于根目录的相对路径（结果按参数缓存，同一批导出中的路径大量重复）
+    
+    参数:
+        filepath: 文件绝对路径
+        root_path: 根目录路径（调用方已 normpath）
+    
+    返回:
+        相对路径（正斜杠分隔）
+    """
+    # 统一路径格式
+    filepath = os.path.normpath(filepath)
+    
+    # 计算相对路径
+    try:
+        rel_path = os.path.relpath(filepath, root_path)
+        # 统一为正斜杠
+        rel_path = rel_path.replace('\\', '/')
+        return rel_path
+    except ValueError:
+        # 如果路径不在根目录下，返回文件名
+        return os.path.basename(filepath)
+
+
+def _strip_extension(path: str, ext: str) -> str:
+    """
+    去掉路径末尾的扩展名（只检查结尾，不会误删路径中间出现的同名子串）
+    
+    参数:
+        path: 路径
+        ext: 扩展名（含点号，如 ".model"）
+    
+    返回:
+        去掉扩展名后的路径
+    """
+    return path[:-len(ext)] if path.endswith(ext) else path
+
+
+@dataclass(frozen=True, slots=True)
+class PathBundle:
+    """单个资源的输出文件路径"""
+    primitives_abs: str     # .primitives 绝对路径
+    visual_abs: str         # .visual 绝对路径
+    model_abs: str          # .model 绝对路径
+    primitives_rel: str     # .primitives 引用路径（相对输出目录）
+    visual_rel: str         # .visual 引用路径（相对资源根目录，不含扩展名）
+
+
+@dataclass(frozen=True, slots=True)
+class FileJob:
+    """单个输出文件的写出任务"""
+    rel_path: str                       # manifest 中的文件路径
+    abs_path: str                       # 绝对路径
+    file_type: str                      # primitives / visual / model / animation
+    dependencies: Tuple[str, ...]       # 依赖文件
+    write: Callable[[], Any]            # 实际写文件的回调
+    sources: Tuple[Any, ...]            # 决定文件内容的源数据（计算指纹用）
+
+
+# 默认并行度：写文件以磁盘 I/O 为主，少量线程即可重叠等待时间
+DEFAULT_PARALLEL_DEGREE = 4
+
+# 无依赖条目共用的空依赖元组（不可变，可安全共享）
+_EMPTY_DEPS: Tuple[str, ...] = ()
+
 class ExportDispatcher:
     """
     ExportDispatcher
@@ -37,24 +113,68 @@ class ExportDispatcher:
     3. 写入 manifest / audit
     4. 校验与回滚
     
+    各流水线只向 manifest 添加条目，manifest.json 在 finalize() 时统一写出一次，
+    此前磁盘上的 manifest 不代表本次导出的结果；各文件先写临时文件再原子替换，
+    导出中断时磁盘上只会有完整的旧文件或新文件
+    
+    每个文件记录源数据指纹；与上一次 manifest 中的指纹相同且文件仍存在时跳过写入
+    
     使用方式:
         dispatcher = ExportDispatcher(export_settings, audit_logger)
         dispatcher.dispatch(object_type, primitives, visual, model, animations)
+        dispatcher.dispatch(object_type, ..., force=True)  # 忽略指纹，强制重写
+        dispatcher.finalize()
+    
+    也可以作为上下文管理器使用：退出时（包括异常）关闭写文件线程池与 manifest.log，
+    未调用 finalize() 时不写出 manifest.json
+        with ExportDispatcher(settings, logger, output_dir) as dispatcher:
+            dispatcher.dispatch(...)
+            dispatcher.finalize()
     """
     
-    def __init__(self, settings: ExportSettings, logger: Logger, output_dir: str):
+    def __init__(self, settings: ExportSettings, logger: Logger, output_dir: str,
+                 parallel_degree: int = DEFAULT_PARALLEL_DEGREE):
         self.settings = settings
         self.logger = logger
         self.output_dir = output_dir  # 真正的输出目录（文件浏览器选择的目录）
         self.path_resolver = PathResolver(output_dir)  # 基于输出目录计算相对路径
         self.manifest = ManifestWriter(str(Path(output_dir) / "manifest.json"))
+        
+        # 同一对象的各个文件（.primitives / .visual / .model / .animation）并行写入
+        # ManifestWriter 不是线程安全的，所有访问都经过 _manifest_lock
+        self.parallel_degree = max(1, parallel_degree)
+        self._pool = ThreadPoolExecutor(max_workers=self.parallel_degree)
+        self._manifest_lock = threading.Lock()
+        
+        # 按资源ID缓存文件路径（输出目录与根目录在导出期间不变）
+        self._path_bundles: Dict[str, PathBundle] = {}
+        
+        # 已确认存在的目录（批量导出到同一目录时不再重复 stat）
+        self._ensured_dirs: Set[str] = set()
+        
+        # 根目录在导出期间不变，规范化结果只计算一次
+        # _root_path 用于计算相对路径；_root_abs 仅在设置了绝对根目录时非 None
+        self._root_path = os.path.normpath(settings.root_path)
+        self._root_abs = (self._root_path
+                          if settings.root_path and os.path.isabs(settings.root_path) else None)
+        
+        # 对象类型 → 流水线，参数统一为 (primitives, visual, model, animations, force)
+        self._handlers: Dict[ObjectType, Callable[..., bool]] = {
+            ObjectType.STATIC: lambda p, v, m, a, force: self._export_static(p, v, m, force),
+            ObjectType.SKINNED: lambda p, v, m, a, force: self._export_skinned(p, v, m, force),
+            ObjectType.CHARACTER: self._export_character,
+            ObjectType.COLLISION: self._placeholder("碰撞体导出功能占位保留"),
+            ObjectType.PORTAL: self._placeholder("门户导出功能占位保留"),
+            ObjectType.GROUP: self._placeholder("组导出功能占位保留"),
+        }
     
     def dispatch(self,
                  object_type: ObjectType,
                  primitives: Optional[Primitives] = None,
                  visual: Optional[Visual] = None,
                  model: Optional[Model] = None,
-                 animations: Optional[List[Animation]] = None) -> bool:
+                 animations: Optional[List[Animation]] = None,
+                 force: bool = False) -> bool:
         """
         调度导出流水线
         
@@ -64,197 +184,187 @@ class ExportDispatcher:
             visual: .visual 数据
             model: .model 数据
             animations: .animation 数据列表
+            force: 忽略指纹，总是重写所有文件
         
         返回:
             导出是否成功
         """
-        try:
-            if object_type == ObjectType.STATIC:
-                return self._export_static(primitives, visual, model)
-            
-            elif object_type == ObjectType.SKINNED:
-                return self._export_skinned(primitives, visual, model)
-            
-            elif object_type == ObjectType.CHARACTER:
-                return self._export_character(primitives, visual, model, animations)
-            
-            elif object_type == ObjectType.COLLISION:
-                self.logger.warning("碰撞体导出功能占位保留")
-                return False
-            
-            elif object_type == ObjectType.PORTAL:
-                self.logger.warning("门户导出功能占位保留")
-                return False
-            
-            elif object_type == ObjectType.GROUP:
-                self.logger.warning("组导出功能占位保留")
-                return False
-            
-            else:
-                self.logger.error(f"未知对象类型: {object_type}")
-                return False
+        handler = self._handlers.get(object_type)
+        if handler is None:
+            self.logger.error(f"未知对象类型: {object_type}")
+            return False
         
+        try:
+            return handler(primitives, visual, model, animations, force)
         except Exception as e:
             self.logger.error(f"导出失败: {e}")
             return False
     
+    def _placeholder(self, message: str) -> Callable[..., bool]:
+        """
+        生成占位流水线（尚未实现的对象类型）：记录警告并返回 False
+        
+        参数:
+            message: 警告信息
+        
+        返回:
+            流水线函数
+        """
+        def handler(*args) -> bool:
+            self.logger.warning(message)
+            return False
+        return handler
+    
     def _export_static(self, 
                        primitives: Optional[Primitives],
                        visual: Optional[Visual],
-                       model: Optional[Model]) -> bool:
+                       model: Optional[Model],
+                       force: bool = False) -> bool:
         """
         导出静态模型
         
         流程: .primitives → .visual → .model → manifest/audit
         """
-        self.logger.info("开始导出静态模型")
-        self.logger.info(f"输出目录: {self.output_dir}")
+        return self._export_mesh_pipeline(primitives, visual, model, "静态模型", force)
+    
+    def _export_skinned(self,
+                       primitives: Optional[Primitives],
+                       visual: Optional[Visual],
+                       model: Optional[Model],
+                       force: bool = False) -> bool:
+        """
+        导出蒙皮模型
+        
+        流程: .primitives → .visual → .model → manifest/audit
+        与静态模型相同，但包含骨骼和蒙皮数据
+        """
+        return self._export_mesh_pipeline(primitives, visual, model, "蒙皮模型", force)
+    
+    def _export_mesh_pipeline(self,
+                              primitives: Optional[Primitives],
+                              visual: Optional[Visual],
+                              model: Optional[Model],
+                              label: str,
+                              force: bool = False) -> bool:
+        """
+        静态/蒙皮模型共用的导出流程
+        
+        参数:
+            primitives: 几何数据
+            visual: 视觉数据
+            model: 模型数据
+            label: 日志中显示的模型类型名称
+            force: 忽略指纹，总是重写
+        
+        返回:
+            导出是否成功
+        """
+        self.logger.info("开始导出%s", label)
+        self.logger.info("输出目录: %s", self.output_dir)
         
         # 计算文件路径
         resource_id = model.resource_id
-        self.logger.info(f"资源ID: {resource_id}")
+        self.logger.info("资源ID: %s", resource_id)
         
-        # 绝对路径（基于输出目录）
-        primitives_abs = os.path.join(self.output_dir, f"{resource_id}.primitives")
-        visual_abs = os.path.join(self.output_dir, f"{resource_id}.visual")
-        model_abs = os.path.join(self.output_dir, f"{resource_id}.model")
-        
-        self.logger.info(f"将写入文件:")
-        self.logger.info(f"  - {primitives_abs}")
-        self.logger.info(f"  - {visual_abs}")
-        self.logger.info(f"  - {model_abs}")
+        # 文件路径（绝对路径与文件内引用的相对路径）
+        paths = self._resolve_paths(resource_id)
         
-        # 相对路径（用于文件内引用）
-        # 需要计算相对于偏好设置根目录的相对路径
-        primitives_rel = f"{resource_id}.primitives"
+        # 三个文件位于同一目录，只需确认一次
+        self._ensure_directory(os.path.dirname(paths.primitives_abs))
         
-        # 计算 visual 的相对路径（相对于偏好设置根目录）
-        # 例如：输出目录 D:\game\res\characters\dragon
-        # 偏好设置根目录 D:\game\res\
-        # 相对路径应该是 characters/dragon/resource_id
-        if self.settings.root_path and os.path.isabs(self.settings.root_path):
-            visual_abs_for_rel = os.path.join(self.output_dir, f"{resource_id}.visual")
-            visual_rel = self._get_relative_to_root(visual_abs_for_rel, self.settings.root_path)
-            # 去掉扩展名
-            visual_rel = visual_rel.replace('.visual', '')
-        else:
-            # 如果没有设置根目录，直接使用resource_id
-            visual_rel = resource_id
+        # .primitives / .visual / .model 之间只有名称引用，内容互不依赖，三个文件并发写出
+        jobs: List[FileJob] = []
         
         # 1. 导出 .primitives
         if primitives:
-            from .writers.primitives_writer import write_primitives
-            try:
-                self.path_resolver.ensure_directory(primitives_abs)
-                write_primitives(primitives_abs, primitives)
-                self.manifest.add_entry(primitives_rel, "primitives", [])
-                self.logger.info(f"已写入 {primitives_abs}")
-            except Exception as e:
-                self.logger.error(f"写入 .primitives 失败: {e}")
-                raise
+            jobs.append(FileJob(
+                paths.primitives_rel, paths.primitives_abs, "primitives", _EMPTY_DEPS,
+                lambda: write_primitives(paths.primitives_abs, primitives),
+                (primitives,)))
         
-        # 2. 导出 .visual
+        # 2. 导出 .visual（依赖 .primitives）
         if visual:
-            from .writers.visual_writer import VisualWriter
-            
             # 注意：.visual 中的 vertices/primitive 是固定值，不是文件路径
             # BigWorld 通过文件名约定自动关联同名 .primitives 文件
-            
-            self.path_resolver.ensure_directory(visual_abs)
-            writer = VisualWriter(visual_abs, visual_rel)
-            writer.write(visual)
-            
-            self.manifest.add_entry(visual_rel, "visual", [primitives_rel])
-            self.logger.info(f"已写入 {visual_abs}")
+            jobs.append(FileJob(
+                paths.visual_rel, paths.visual_abs, "visual", (paths.primitives_rel,),
+                lambda: VisualWriter(paths.visual_abs, paths.visual_rel).write(visual),
+                (visual, paths.visual_rel)))
         
-        # 3. 导出 .model
+        # 3. 导出 .model（依赖 .visual）
         if model:
-            from .writers.model_writer import write_model
-            
             # 更新 model 中的 visual 引用为相对路径（去掉扩展名）
-            # 例如：从 "models.visual" 改为 "models"
-            self.logger.info(f"设置 model.visual = {visual_rel}")
-            model.visual = visual_rel
+            model.visual = paths.visual_rel
             
-            self.path_resolver.ensure_directory(model_abs)
-            write_model(model_abs, model)
-            
-            model_rel = self.path_resolver.to_relative(model_abs, remove_extension=True)
-            self.manifest.add_entry(model_rel, "model", [visual_rel])
-            self.logger.info(f"已写入 {model_abs}")
+            model_rel = _strip_extension(
+                self._get_relative_to_root(paths.model_abs, self._root_path), '.model')
+            jobs.append(FileJob(
+                model_rel, paths.model_abs, "model", (paths.visual_rel,),
+                lambda: write_model(paths.model_abs, model),
+                (model,)))
         
-        # 4. 保存 manifest
-        self.manifest.save()
-        self.logger.info("已写入 manifest.json")
+        self._write_files(jobs, force)
         
         return True
     
-    def _export_skinned(self,
-                       primitives: Optional[Primitives],
-                       visual: Optional[Visual],
-                       model: Optional[Model]) -> bool:
+    def _resolve_paths(self, resource_id: str) -> PathBundle:
         """
-        导出蒙皮模型
+        一次计算资源的全部文件路径（同一资源重复导出时直接复用）
         
-        流程: .primitives → .visual → .model → manifest/audit
-        与静态模型相同，但包含骨骼和蒙皮数据
-        """
-        self.logger.info("开始导出蒙皮模型")
-        self.logger.info(f"输出目录: {self.output_dir}")
+        参数:
+            resource_id: 资源ID
         
-        # 计算文件路径
-        resource_id = model.resource_id
+        返回:
+            PathBundle
+        """
+        paths = self._path_bundles.get(resource_id)
+        if paths is not None:
+            return paths
         
         # 绝对路径（基于输出目录）
-        primitives_abs = os.path.join(self.output_dir, f"{resource_id}.primitives")
-        visual_abs = os.path.join(self.output_dir, f"{resource_id}.visual")
-        model_abs = os.path.join(self.output_dir, f"{resource_id}.model")
-        
-        # 相对路径（用于文件内引用）
-        primitives_rel = f"{resource_id}.primitives"
+        base = os.path.join(self.output_dir, resource_id)
+        visual_abs = f"{base}.visual"
         
-        # 计算visual的相对路径
-        if self.settings.root_path and os.path.isabs(self.settings.root_path):
-            visual_rel = self._get_relative_to_root(visual_abs, self.settings.root_path)
-            visual_rel = visual_rel.replace('.visual', '')
+        # 计算 visual 的相对路径（相对于偏好设置根目录）
+        # 例如：输出目录 D:\game\res\characters\dragon
+        # 偏好设置根目录 D:\game\res\
+        # 相对路径应该是 characters/dragon/resource_id
+        if self._root_abs is not None:
+            visual_rel = _strip_extension(
+                self._get_relative_to_root(visual_abs, self._root_abs), '.visual')
         else:
+            # 如果没有设置根目录，直接使用resource_id
             visual_rel = resource_id
         
-        # 1. 导出 .primitives
-        if primitives:
-            from .writers.primitives_writer import write_primitives
-            write_primitives(primitives_abs, primitives)
-            self.manifest.add_entry(primitives_rel, "primitives", [])
-            self.logger.info(f"已写入 {primitives_abs}")
-        
-        # 2. 导出 .visual（依赖 .primitives）
-        if visual:
-            from .writers.visual_writer import VisualWriter
-            writer = VisualWriter(visual_abs, visual_rel)
-            writer.write(visual)
-            
-            self.manifest.add_entry(visual_rel, "visual", [primitives_rel])
-            self.logger.info(f"已写入 {visual_abs}")
-        
-        # 3. 导出 .model（依赖 .visual）
-        if model:
-            from .writers.model_writer import write_model
-            
-            # 更新model中的visual引用为相对路径
-            model.visual = visual_rel
-            
-            write_model(model_abs, model)
-            
-            model_rel = self._get_relative_to_root(model_abs, self.settings.root_path)
-            model_rel = model_rel.replace('.model', '')
-            self.manifest.add_entry(model_rel, "model", [visual_rel])
-            self.logger.info(f"已写入 {model_abs}")
+        paths = PathBundle(
+            primitives_abs=f"{base}.primitives",
+            visual_abs=visual_abs,
+            model_abs=f"{base}.model",
+            primitives_rel=f"{resource_id}.primitives",
+            visual_rel=visual_rel
+        )
+        self._path_bundles[resource_id] = paths
+        return paths
+    
+    def _ensure_directory(self, directory: str) -> None:
+        """
+        确保目录存在（本次导出中已确认过的目录直接跳过）
         
-        # 4. 保存 manifest
-        self.manifest.save()
-        self.logger.info("已写入 manifest.json")
+        直接尝试 mkdir：目录已存在或刚创建都只需一次系统调用；
+        父目录不存在时才退回 os.makedirs 逐级创建（makedirs 每次都会先 stat 父目录）
         
-        return True
+        参数:
+            directory: 目录路径
+        """
+        if not directory or directory in self._ensured_dirs:
+            return
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            os.makedirs(directory, exist_ok=True)
+        self._ensured_dirs.add(directory)
     
     def _get_relative_to_root(self, filepath: str, root_path: str) -> str:
         """
@@ -262,30 +372,19 @@ class ExportDispatcher:
         
         参数:
             filepath: 文件绝对路径
-            root_path: 根目录路径
+            root_path: 已规范化的根目录路径（self._root_path / self._root_abs）
         
         返回:
             相对路径（正斜杠分隔）
         """
-        # 统一路径格式
-        filepath = os.path.normpath(filepath)
-        root_path = os.path.normpath(root_path)
-        
-        # 计算相对路径
-        try:
-            rel_path = os.path.relpath(filepath, root_path)
-            # 统一为正斜杠
-            rel_path = rel_path.replace('\\', '/')
-            return rel_path
-        except ValueError:
-            # 如果路径不在根目录下，返回文件名
-            return os.path.basename(filepath)
+        return _relative_to_root(filepath, root_path)
     
     def _export_character(self,
                           primitives: Optional[Primitives],
                           visual: Optional[Visual],
                           model: Optional[Model],
-                          animations: Optional[List[Animation]]) -> bool:
+                          animations: Optional[List[Animation]],
+                          force: bool = False) -> bool:
         """
         导出角色模型
         
@@ -301,97 +400,175 @@ class ExportDispatcher:
         # 计算文件路径
         resource_id = model.resource_id
         
-        # 绝对路径（基于输出目录）
-        primitives_abs = os.path.join(self.output_dir, f"{resource_id}.primitives")
-        visual_abs = os.path.join(self.output_dir, f"{resource_id}.visual")
-        model_abs = os.path.join(self.output_dir, f"{resource_id}.model")
+        # 文件路径（绝对路径与文件内引用的相对路径）
+        paths = self._resolve_paths(resource_id)
         
-        # 相对路径（用于文件内引用）
-        primitives_rel = f"{resource_id}.primitives"
+        # 三个文件位于同一目录，只需确认一次
+        self._ensure_directory(os.path.dirname(paths.primitives_abs))
         
-        # 计算visual的相对路径
-        if self.settings.root_path and os.path.isabs(self.settings.root_path):
-            visual_rel = self._get_relative_to_root(visual_abs, self.settings.root_path)
-            visual_rel = visual_rel.replace('.visual', '')
-        else:
-            visual_rel = resource_id
+        # 各文件之间只有名称引用（.model 引用 .visual 与 .animation 的路径），内容互不依赖，
+        # 全部并发写出；manifest 条目按下面的顺序添加
+        jobs: List[FileJob] = []
         
         # 1. 导出 .primitives
         if primitives:
-            from .writers.primitives_writer import write_primitives
-            write_primitives(primitives_abs, primitives)
-            self.manifest.add_entry(primitives_rel, "primitives", [])
-            self.logger.info(f"已写入 {primitives_abs}")
+            jobs.append(FileJob(
+                paths.primitives_rel, paths.primitives_abs, "primitives", _EMPTY_DEPS,
+                lambda: write_primitives(paths.primitives_abs, primitives),
+                (primitives,)))
         
         # 2. 导出 .visual（依赖 .primitives）
         if visual:
-            from .writers.visual_writer import VisualWriter
-            writer = VisualWriter(visual_abs, visual_rel)
-            writer.write(visual)
-            
-            self.manifest.add_entry(visual_rel, "visual", [primitives_rel])
-            self.logger.info(f"已写入 {visual_abs}")
+            jobs.append(FileJob(
+                paths.visual_rel, paths.visual_abs, "visual", (paths.primitives_rel,),
+                lambda: VisualWriter(paths.visual_abs, paths.visual_rel).write(visual),
+                (visual, paths.visual_rel)))
         
         # 3. 导出 .animation（到 animations/ 子目录）
-        anim_paths = []
-        anim_rel_paths = []  # 用于.model引用的相对路径
+        # 同一趟循环里生成写出任务和 .model 的动画引用
+        model_anims: List[ModelAnimation] = []
         if animations:
-            from .writers.animation_writer import write_animation
-            
             # 创建 animations 子目录
             animations_dir = os.path.join(self.output_dir, "animations")
-            os.makedirs(animations_dir, exist_ok=True)
+            self._ensure_directory(animations_dir)
+            prefix = animations_dir + os.sep
             
             for anim in animations:
                 # 动画文件保存到 animations/ 子目录
-                anim_filename = f"{anim.name}.animation"
-                anim_abs_path = os.path.join(animations_dir, anim_filename)
-                
-                write_animation(anim_abs_path, anim)
+                anim_abs_path = f"{prefix}{anim.name}.animation"
+                # 计算相对于root_path的路径（用于.model引用，不含扩展名）
+                anim_rel = _strip_extension(
+                    self._get_relative_to_root(anim_abs_path, self._root_path), '.animation')
+                model_anims.append(ModelAnimation(name=anim.name, resource=anim_rel))
                 
-                # 计算相对于root_path的路径（用于.model引用）
-                anim_rel = self._get_relative_to_root(anim_abs_path, self.settings.root_path)
-                anim_rel = anim_rel.replace('.animation', '')  # 去掉扩展名
-                
-                anim_paths.append(anim_abs_path)
-                anim_rel_paths.append(anim_rel)
-                
-                self.manifest.add_entry(anim_rel, "animation", [])
-                self.logger.info(f"已写入 {anim_abs_path}")
-                self.logger.info(f"  动画引用路径: {anim_rel}")
+                jobs.append(FileJob(
+                    anim_rel, anim_abs_path, "animation", _EMPTY_DEPS,
+                    partial(write_animation, anim_abs_path, anim),
+                    (anim,)))
         
         # 4. 导出 .model（依赖 .visual 和 .animation）
         if model:
-            from .writers.model_writer import write_model
-            from .core.schema import ModelAnimation
-            
             # 更新 Model 的动画引用列表
-            model.animations = []
-            for anim_rel in anim_rel_paths:
-                model.animations.append(ModelAnimation(
-                    name=os.path.basename(anim_rel),  # 动画名
-                    resource=anim_rel  # 相对路径（不含扩展名）
-                ))
+            model.animations = model_anims
             
             # 更新model中的visual引用为相对路径
-            model.visual = visual_rel
+            model.visual = paths.visual_rel
             
-            write_model(model_abs, model)
-            
-            model_rel = self._get_relative_to_root(model_abs, self.settings.root_path)
-            model_rel = model_rel.replace('.model', '')
-            deps = [visual_rel] + anim_rel_paths
-            self.manifest.add_entry(model_rel, "model", deps)
-            self.logger.info(f"已写入 {model_abs}")
-            self.logger.info(f"  包含 {len(model.animations)} 个动画引用")
-        
-        # 5. 保存 manifest
-        self.manifest.save()
-        self.logger.info("已写入 manifest.json")
+            model_rel = _strip_extension(
+                self._get_relative_to_root(paths.model_abs, self._root_path), '.model')
+            deps = (paths.visual_rel, *(ma.resource for ma in model_anims))
+            jobs.append(FileJob(
+                model_rel, paths.model_abs, "model", deps,
+                lambda: write_model(paths.model_abs, model),
+                (model,)))
+        
+        self._write_files(jobs, force)
+        
+        for model_anim in model_anims:
+            self.logger.info("  动画引用路径: %s", model_anim.resource)
+        if model:
+            self.logger.info("  包含 %d 个动画引用", len(model.animations))
         
         return True
     
+    def _is_unchanged(self, rel_path: str, abs_path: str, file_type: str,
+                      fingerprint: str, force: bool) -> bool:
+        """
+        判断文件能否跳过写入（指纹与上一次导出相同且文件仍存在）
+        
+        参数:
+            rel_path: manifest 中的文件路径
+            abs_path: 文件绝对路径
+            file_type: 文件类型
+            fingerprint: 本次源数据指纹
+            force: 强制重写
+        
+        返回:
+            是否可以跳过
+        """
+        if force or not fingerprint:
+            return False
+        with self._manifest_lock:
+            previous = self.manifest.previous_fingerprint(rel_path, file_type)
+        return previous == fingerprint and os.path.exists(abs_path)
+    
+    def _write_files(self, jobs: List[FileJob], force: bool) -> None:
+        """
+        在写文件线程池中并发写出同一对象的各个文件（指纹未变化的跳过），
+        全部完成后按 jobs 顺序添加 manifest 条目（未变化的文件同样保留条目）
+        
+        参数:
+            jobs: 写出任务
+            force: 强制重写
+        
+        异常:
+            任一文件写入失败时抛出第一个失败的异常（其余文件仍会等待写完并记入 manifest）
+        """
+        def run(job: FileJob) -> Tuple[str, bool]:
+            fingerprint = compute_fingerprint(*job.sources)
+            if self._is_unchanged(job.rel_path, job.abs_path, job.file_type, fingerprint, force):
+                return fingerprint, False
+            job.write()
+            return fingerprint, True
+        
+        futures = [self._pool.submit(run, job) for job in jobs]
+        wait(futures)
+        
+        # 先记录所有成功的文件（已写入磁盘，必须进入 manifest.log），最后再抛出第一个失败
+        first_error: Optional[BaseException] = None
+        for job, future in zip(jobs, futures):
+            try:
+                fingerprint, written = future.result()
+            except Exception as e:
+                self.logger.error("写入 .%s 失败: %s", job.file_type, e, exc_info=True)
+                if first_error is None:
+                    first_error = e
+                continue
+            
+            self._add_manifest_entry(job.rel_path, job.file_type, job.dependencies, fingerprint)
+            if written:
+                self.logger.info("已写入 %s", job.abs_path)
+            else:
+                self.logger.info("未变化，跳过 %s", job.abs_path)
+        
+        if first_error is not None:
+            raise first_error
+    
+    def _add_manifest_entry(self, file_path: str, file_type: str,
+                            dependencies: Sequence[str] = _EMPTY_DEPS,
+                            fingerprint: str = "") -> None:
+        """添加 manifest 条目（线程安全）"""
+        with self._manifest_lock:
+            self.manifest.add_entry(file_path, file_type, dependencies, fingerprint)
+    
+    def _save_manifest(self) -> None:
+        """保存 manifest.json（线程安全）"""
+        with self._manifest_lock:
+            self.manifest.save()
+    
     def finalize(self) -> None:
-        """完成导出，保存 manifest"""
-        self.manifest.save()
+        """完成导出，保存 manifest（唯一的写出点）并关闭写文件线程池"""
+        # 各文件写完时已原子替换；manifest 最后提交（只有它 fsync）
+        try:
+            self._save_manifest()
+            self.logger.info("已写入 manifest.json")
+        finally:
+            self.close()
+    
+    def close(self) -> None:
+        """
+        释放资源：等待并关闭写文件线程池，关闭 manifest.log 句柄（可重复调用）
+        
+        导出失败时调用：已写完的条目保留在 manifest.log 中，下次导出回放
+        """
+        self._pool.shutdown(wait=True)
+        with self._manifest_lock:
+            self.manifest.close()
+    
+    def __enter__(self) -> "ExportDispatcher":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
 
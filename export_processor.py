@@ -6,13 +6,14 @@
 # - 支持不同的导出类型和模式
 
 import bpy
-from typing import List, Optional, Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Dict, Any, Tuple
 from .core.coordinate_converter import CoordinateConverter
 from .utils.file_manager import FileManager
 from .utils.logger import Logger
 from .core.schema import (
     Primitives, Visual, Model, Skeleton, Animation, 
-    ModelAnimation, ExportSettings, ObjectType
+    ModelAnimation, ExportSettings, FileOptions, ObjectType
 )
 from .export_builders import (
     PrimitivesBuilder, VisualBuilder, ModelBuilder, 
@@ -31,7 +32,8 @@ class ExportProcessor:
     基于UI选择动态组合流程，集成所有公用组件
     """
     
-    def __init__(self, settings: ExportSettings, logger: Logger, output_dir: str):
+    def __init__(self, settings: ExportSettings, logger: Logger, output_dir: str,
+                 force_rewrite: bool = False):
         """
         初始化导出处理器
         
@@ -39,10 +41,12 @@ class ExportProcessor:
             settings: 导出设置
             logger: 日志记录器
             output_dir: 输出目录
+            force_rewrite: 忽略 manifest 中的指纹，重写所有文件
         """
         self.settings = settings
         self.logger = logger
         self.output_dir = output_dir
+        self.force_rewrite = force_rewrite
         
         # 公用组件
         self.coordinate_converter = CoordinateConverter()
@@ -50,10 +54,63 @@ class ExportProcessor:
         
         # 创建导出调度器
         self.dispatcher = ExportDispatcher(settings, logger, output_dir)
+        
+        # process_objects 期间的后台写出线程与最近一次提交的写出任务
+        self._write_executor: Optional[ThreadPoolExecutor] = None
+        self._pending_write: Optional[Future] = None
+    
+    def process_objects(self, objects: Iterable[bpy.types.Object],
+                        export_type: str,
+                        file_options: FileOptions,
+                        on_begin: Optional[Callable[[int, bpy.types.Object], None]] = None
+                        ) -> Iterator[Tuple[bpy.types.Object, bool]]:
+        """
+        依次处理多个对象，构建与写文件流水线重叠
+        
+        Blender 数据只在主线程读取（构建阶段）；写文件只使用已构建好的数据，
+        交给后台线程执行，主线程同时构建下一个对象
+        
+        参数:
+            objects: Blender对象列表
+            export_type: 导出类型 (STATIC, SKINNED, CHARACTER)
+            file_options: 文件生成选项
+            on_begin: 开始处理每个对象前的回调 (序号, 对象)
+        
+        返回:
+            按对象顺序产生 (对象, 导出是否成功)
+        """
+        previous = None
+        with ThreadPoolExecutor(max_workers=1) as self._write_executor:
+            try:
+                for idx, obj in enumerate(objects):
+                    if on_begin:
+                        on_begin(idx, obj)
+                    self._pending_write = None
+                    built = self.process_object(obj, export_type, file_options)
+                    current = (obj, built, self._pending_write)
+                    
+                    # 当前对象已提交写出后，再等待并报告上一个对象的结果
+                    if previous is not None:
+                        yield self._collect_result(previous)
+                    previous = current
+                
+                if previous is not None:
+                    yield self._collect_result(previous)
+            finally:
+                self._write_executor = None
+                self._pending_write = None
+    
+    @staticmethod
+    def _collect_result(entry: Tuple[bpy.types.Object, bool, Optional[Future]]) -> Tuple[bpy.types.Object, bool]:
+        """等待对象的后台写出完成，返回 (对象, 导出是否成功)"""
+        obj, built, write = entry
+        if write is None:
+            return obj, built
+        return obj, write.result()
     
     def process_object(self, obj: bpy.types.Object, 
                       export_type: str, 
-                      file_options: Dict[str, bool]) -> bool:
+                      file_options: FileOptions) -> bool:
         """
         处理单个对象的导出
         
@@ -99,7 +156,31 @@ class ExportProcessor:
                 return mod.object
         return None
     
-    def _process_static(self, obj: bpy.types.Object, file_options: Dict[str, bool]) -> bool:
+    def _build_mesh_data(self, obj: bpy.types.Object, resource_id: str,
+                         skeleton: Optional[Skeleton]) -> Tuple[Primitives, Visual, Model]:
+        """
+        一次构建对象的 Primitives、Visual、Model
+        
+        三者读取同一对象的网格、材质与包围盒数据，放在一起构建，
+        包围盒只从 Blender 读取一次，Visual 与 Model 共用
+        
+        参数:
+            obj: Blender对象
+            resource_id: 资源ID
+            skeleton: 骨骼数据（静态模型为 None）
+        
+        返回:
+            (primitives, visual, model)
+        """
+        has_skeleton = skeleton is not None
+        primitives = PrimitivesBuilder.build(obj, force_static=not has_skeleton)
+        visual = VisualBuilder.build(obj, f"{resource_id}.primitives", skeleton)
+        model = ModelBuilder.build(obj, resource_id, has_skeleton=has_skeleton,
+                                   bounding_box=visual.bounding_box)
+        model.resource_id = resource_id
+        return primitives, visual, model
+    
+    def _process_static(self, obj: bpy.types.Object, file_options: FileOptions) -> bool:
         """
         处理静态模型导出
         
@@ -113,13 +194,8 @@ class ExportProcessor:
         self.logger.info(f"开始处理静态模型: {obj.name}")
         
         # 构建数据
-        resource_id = obj.bigworld_props.resource_id if obj.bigworld_props.resource_id else obj.name
-        primitives = PrimitivesBuilder.build(obj, force_static=True)
-        visual = VisualBuilder.build(obj, f"{resource_id}.primitives", skeleton=None)
-        model = ModelBuilder.build(obj, resource_id, has_skeleton=False)
-        
-        # 设置资源ID
-        model.resource_id = resource_id
+        resource_id = obj.bigworld_props.resource_id or obj.name
+        primitives, visual, model = self._build_mesh_data(obj, resource_id, skeleton=None)
         
         # 生成文件
         return self._generate_files(
@@ -132,7 +208,7 @@ class ExportProcessor:
         )
     
     def _process_skinned(self, obj: bpy.types.Object, armature_obj: Optional[bpy.types.Object], 
-                        file_options: Dict[str, bool]) -> bool:
+                        file_options: FileOptions) -> bool:
         """
         处理蒙皮模型导出
         
@@ -153,14 +229,9 @@ class ExportProcessor:
         self.logger.info(f"检测到 Armature: {armature_obj.name}")
         
         # 构建数据
-        resource_id = obj.bigworld_props.resource_id if obj.bigworld_props.resource_id else obj.name
+        resource_id = obj.bigworld_props.resource_id or obj.name
         skeleton = SkeletonBuilder.build(armature_obj)
-        primitives = PrimitivesBuilder.build(obj, force_static=False)
-        visual = VisualBuilder.build(obj, f"{resource_id}.primitives", skeleton)
-        model = ModelBuilder.build(obj, resource_id, has_skeleton=True)
-        
-        # 设置资源ID
-        model.resource_id = resource_id
+        primitives, visual, model = self._build_mesh_data(obj, resource_id, skeleton)
         
         # 构建硬点（新增）
         obj_settings = ObjectExportSettings.from_object_properties(obj)
@@ -180,7 +251,7 @@ class ExportProcessor:
         )
     
     def _process_character(self, obj: bpy.types.Object, armature_obj: Optional[bpy.types.Object], 
-                          file_options: Dict[str, bool]) -> bool:
+                          file_options: FileOptions) -> bool:
         """
         处理角色动画导出
         
@@ -201,18 +272,13 @@ class ExportProcessor:
         self.logger.info(f"检测到 Armature: {armature_obj.name}")
         
         # 构建数据
-        resource_id = obj.bigworld_props.resource_id if obj.bigworld_props.resource_id else obj.name
+        resource_id = obj.bigworld_props.resource_id or obj.name
         skeleton = SkeletonBuilder.build(armature_obj)
-        primitives = PrimitivesBuilder.build(obj, force_static=False)
-        visual = VisualBuilder.build(obj, f"{resource_id}.primitives", skeleton)
+        primitives, visual, model = self._build_mesh_data(obj, resource_id, skeleton)
         
         # 构建动画数据
         animations = self._build_animations(armature_obj)
         
-        # 构建模型数据（包含动画引用）
-        model = ModelBuilder.build(obj, resource_id, has_skeleton=True)
-        model.resource_id = resource_id
-        
         # 添加动画引用
         if animations:
             model.animations = []
@@ -295,7 +361,7 @@ class ExportProcessor:
     def _generate_files(self, object_type: ObjectType, primitives: Optional[Primitives], 
                        visual: Optional[Visual], model: Optional[Model], 
                        animations: Optional[List[Animation]], 
-                       file_options: Dict[str, bool]) -> bool:
+                       file_options: FileOptions) -> bool:
         """
         生成文件
         
@@ -307,6 +373,22 @@ class ExportProcessor:
             animations: 动画数据
             file_options: 文件生成选项
         
+        返回:
+            生成是否成功
+        """
+        # process_objects 期间交给后台线程写出，结果在 _collect_result 中取得
+        if self._write_executor is not None:
+            self._pending_write = self._write_executor.submit(
+                self._dispatch_files, object_type, primitives, visual, model, animations)
+            return True
+        return self._dispatch_files(object_type, primitives, visual, model, animations)
+    
+    def _dispatch_files(self, object_type: ObjectType, primitives: Optional[Primitives],
+                        visual: Optional[Visual], model: Optional[Model],
+                        animations: Optional[List[Animation]]) -> bool:
+        """
+        调用 ExportDispatcher 写出文件
+        
         返回:
             生成是否成功
         """
@@ -317,7 +399,8 @@ class ExportProcessor:
                 primitives=primitives,
                 visual=visual,
                 model=model,
-                animations=animations
+                animations=animations,
+                force=self.force_rewrite
             )
             
             if success:
@@ -330,3 +413,15 @@ class ExportProcessor:
         except Exception as e:
             self.logger.error(f"文件生成失败: {e}")
             return False
+    
+    def finalize(self) -> None:
+        """
+        完成所有对象的导出（写出 manifest.json）
+        """
+        self.dispatcher.finalize()
+    
+    def close(self) -> None:
+        """
+        释放导出资源（写文件线程池、manifest.log 句柄），导出失败时也必须调用（可重复调用）
+        """
+        self.dispatcher.close()
@@ -15,11 +15,66 @@ from bpy.props import (
     StringProperty,
     PointerProperty
 )
+from ..core.schema import FileOptions
 
 
 # ==================== 属性组 ====================
 
-class BigWorldExportSettings(PropertyGroup):
+class BigWorldFileOptionsMixin:
+    """
+    生成文件选项（导出设置属性组与导出操作符共用的属性定义）
+    
+    .model 选项两处的显示名称不同，由各自的类单独定义
+    """
+    
+    export_primitives: BoolProperty(
+        name=".primitives",
+        description="生成 .primitives 文件",
+        default=True
+    )
+    
+    export_visual: BoolProperty(
+        name=".visual",
+        description="生成 .visual 文件",
+        default=True
+    )
+    
+    export_animation: BoolProperty(
+        name=".animation",
+        description="生成 .animation 文件（角色模型）",
+        default=True
+    )
+    
+    export_manifest: BoolProperty(
+        name="manifest.json",
+        description="生成 manifest.json 清单",
+        default=True
+    )
+    
+    export_audit: BoolProperty(
+        name="audit.log",
+        description="生成 audit.log 审计日志",
+        default=True
+    )
+    
+    def file_options(self) -> FileOptions:
+        """
+        按当前勾选状态构造 FileOptions
+        
+        返回:
+            FileOptions
+        """
+        return FileOptions(
+            export_primitives=self.export_primitives,
+            export_visual=self.export_visual,
+            export_animation=self.export_animation,
+            export_model=self.export_model,
+            export_manifest=self.export_manifest,
+            export_audit=self.export_audit
+        )
+
+
+class BigWorldExportSettings(BigWorldFileOptionsMixin, PropertyGroup):
     """导出执行设置"""
     
     # 导出类型 ✔
@@ -47,25 +102,7 @@ class BigWorldExportSettings(PropertyGroup):
         default='PRIMITIVES'
     )
     
-    # 生成文件选项 ✔
-    export_primitives: BoolProperty(
-        name=".primitives",
-        description="生成 .primitives 文件",
-        default=True
-    )
-    
-    export_visual: BoolProperty(
-        name=".visual",
-        description="生成 .visual 文件",
-        default=True
-    )
-    
-    export_animation: BoolProperty(
-        name=".animation",
-        description="生成 .animation 文件（角色模型）",
-        default=True
-    )
-    
+    # 生成文件选项 ✔（.primitives/.visual/.animation/manifest/audit 来自 BigWorldFileOptionsMixin）
     export_collision: BoolProperty(
         name=".collision",
         description="生成 .collision 文件（占位保留）",
@@ -78,18 +115,6 @@ class BigWorldExportSettings(PropertyGroup):
         default=True
     )
     
-    export_manifest: BoolProperty(
-        name="manifest.json",
-        description="生成 manifest.json 清单",
-        default=True
-    )
-    
-    export_audit: BoolProperty(
-        name="audit.log",
-        description="生成 audit.log 审计日志",
-        default=True
-    )
-    
     # 目录策略 ◆ 占位保留
     directory_strategy: EnumProperty(
         name="目录策略",
@@ -16,6 +16,10 @@ from bpy.props import (
 )
 
 
+# 需要 Armature 的导出类型（面板每次重绘都会检查，模块加载时构建一次）
+_ARMATURE_EXPORT_TYPES = frozenset(('SKINNED', 'CHARACTER'))
+
+
 # ==================== 属性组 ====================
 
 class BigWorldObjectProperties(PropertyGroup):
@@ -44,6 +48,12 @@ class BigWorldObjectProperties(PropertyGroup):
         description="继承的父模型路径（用于角色组件，如：characters/base）",
         default=""
     )
+    
+    optimize_mesh: BoolProperty(
+        name="网格优化",
+        description="按分组重排三角形提升顶点缓存命中（Tipsify），再按使用顺序重排顶点提升顶点读取效率",
+        default=False
+    )
 
 
 class BigWorldAction(PropertyGroup):
@@ -150,11 +160,14 @@ class BIGWORLD_PT_object_panel(Panel):
         box.prop(props, "resource_id", text="ID")
         
         # 父模型（仅蒙皮和角色动画可用）
-        if props.export_type in {'SKINNED', 'CHARACTER'}:
+        if props.export_type in _ARMATURE_EXPORT_TYPES:
             box.prop(props, "parent_model", text="父模型", icon='LINKED')
         
+        if obj.type == 'MESH':
+            box.prop(props, "optimize_mesh")
+        
         # ========== 硬点管理（仅蒙皮和角色动画显示）==========
-        if props.export_type in {'SKINNED', 'CHARACTER'} and obj.type == 'MESH':
+        if props.export_type in _ARMATURE_EXPORT_TYPES and obj.type == 'MESH':
             # 检查属性是否存在
             if not hasattr(obj, 'bigworld_hardpoints'):
                 layout.label(text="硬点属性未初始化", icon='ERROR')
@@ -256,7 +269,7 @@ class BIGWORLD_OT_validate_object(bpy.types.Operator):
             self.report({'WARNING'}, "资源ID为空，将使用对象名称")
         
         # 骨架检查
-        if props.export_type in {'SKINNED', 'CHARACTER'}:
+        if props.export_type in _ARMATURE_EXPORT_TYPES:
             has_armature = any(mod.type == 'ARMATURE' for mod in obj.modifiers)
             if not has_armature:
                 self.report({'ERROR'}, "蒙皮/角色动画类型需要Armature修改器")
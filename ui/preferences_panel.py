@@ -58,6 +58,12 @@ class BigWorldAddonPreferences(AddonPreferences):
         default=True
     )
     
+    verbose_log: BoolProperty(
+        name="控制台详细日志",
+        description="在控制台输出每一步的导出信息（关闭时只输出警告和错误；从终端启动 Blender 时始终输出）",
+        default=False
+    )
+    
     # ===== UI绘制 =====
     def draw(self, context):
         layout = self.layout
@@ -79,6 +85,7 @@ class BigWorldAddonPreferences(AddonPreferences):
         box.label(text="导出选项", icon='SETTINGS')
         box.prop(self, "auto_validate")
         box.prop(self, "write_audit")
+        box.prop(self, "verbose_log")
         
         # 保存设置
         layout.separator()
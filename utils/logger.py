@@ -7,6 +7,7 @@
 
 import sys
 import time
+import traceback
 from typing import Optional, TYPE_CHECKING
 
 # 避免循环导入
@@ -19,16 +20,35 @@ class Logger:
     Logger
     ------
     提供统一的日志接口。
-    - 支持级别: INFO / WARNING / ERROR
+    - 支持级别: INFO / WARNING / ERROR，低于 level 的日志直接丢弃
     - 输出到控制台 (stdout/stderr)
     - 可选绑定 AuditLogger，将日志写入 audit.log
+    - 消息支持 %-style 参数（logger.info("已写入 %s", path)），
+      被过滤的日志不会执行字符串格式化
+    - error(..., exc_info=True) 附带当前异常的 traceback，同样只在日志会输出时才格式化
     """
 
-    def __init__(self, audit_logger: Optional["AuditLogger"] = None, verbose: bool = True):
+    LEVELS = {"INFO": 20, "WARNING": 30, "ERROR": 40}
+
+    def __init__(self, audit_logger: Optional["AuditLogger"] = None, verbose: bool = True,
+                 level: str = "INFO"):
         self.audit_logger = audit_logger
         self.verbose = verbose
+        self.level = self.LEVELS[level]
+
+    def is_enabled_for(self, level: str) -> bool:
+        """该级别的日志是否会被输出（用于跳过昂贵的日志内容构造）"""
+        return (self.verbose or self.audit_logger is not None) and self.LEVELS[level] >= self.level
+
+    def _log(self, level: str, message: str, args: tuple = (), context: Optional[str] = None,
+             exc_info: bool = False) -> None:
+        if not self.is_enabled_for(level):
+            return
+        if args:
+            message = message % args
+        if exc_info:
+            message = f"{message}\n{traceback.format_exc().rstrip()}"
 
-    def _log(self, level: str, message: str, context: Optional[str] = None) -> None:
         ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
         line = f"[{ts}] [{level}] {message}"
         if context:
@@ -50,14 +70,15 @@ class Logger:
             elif level == "ERROR":
                 self.audit_logger.error(message, context)
 
-    def info(self, message: str, context: Optional[str] = None) -> None:
+    def info(self, message: str, *args, context: Optional[str] = None) -> None:
         """记录 INFO 日志"""
-        self._log("INFO", message, context)
+        self._log("INFO", message, args, context)
 
-    def warning(self, message: str, context: Optional[str] = None) -> None:
+    def warning(self, message: str, *args, context: Optional[str] = None) -> None:
         """记录 WARNING 日志"""
-        self._log("WARNING", message, context)
+        self._log("WARNING", message, args, context)
 
-    def error(self, message: str, context: Optional[str] = None) -> None:
-        """记录 ERROR 日志"""
-        self._log("ERROR", message, context)
+    def error(self, message: str, *args, context: Optional[str] = None,
+              exc_info: bool = False) -> None:
+        """记录 ERROR 日志（exc_info=True 时附带当前异常的 traceback）"""
+        self._log("ERROR", message, args, context, exc_info)
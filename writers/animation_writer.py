@@ -9,6 +9,7 @@
 import struct
 from typing import List, Tuple
 from ..core.schema import Animation, AnimationChannel
+from ..core.io.buffering import open_for_write
 
 
 class AnimationWriter:
@@ -41,7 +42,7 @@ class AnimationWriter:
         参数:
             animation: Animation 数据结构
         """
-        with open(self.filepath, 'wb') as f:
+        with open_for_write(self.filepath, 'wb') as f:
             # 1. totalTime (float)
             f.write(struct.pack('<f', animation.duration))
             
@@ -92,23 +93,32 @@ class AnimationWriter:
         self._write_string(f, channel.bone_name)
         
         # 2. Scale keys
-        f.write(struct.pack('<i', len(channel.keys.scale_keys)))
-        for time, scale in channel.keys.scale_keys:
-            f.write(struct.pack('<f', time))
-            f.write(struct.pack('<fff', scale[0], scale[1], scale[2]))
-        
         # 3. Position keys
-        f.write(struct.pack('<i', len(channel.keys.position_keys)))
-        for time, pos in channel.keys.position_keys:
-            f.write(struct.pack('<f', time))
-            f.write(struct.pack('<fff', pos[0], pos[1], pos[2]))
-        
-        # 4. Rotation keys (Quaternion)
-        f.write(struct.pack('<i', len(channel.keys.rotation_keys)))
-        for time, rot in channel.keys.rotation_keys:
-            f.write(struct.pack('<f', time))
-            # BigWorld Quaternion format: (x, y, z, w)
-            f.write(struct.pack('<ffff', rot[0], rot[1], rot[2], rot[3]))
+        # 4. Rotation keys (Quaternion)，BigWorld Quaternion format: (x, y, z, w)
+        # 每组关键帧整体一次 struct.pack，逐元素的 float 转换在 struct 的 C 循环里完成
+        f.write(_pack_keys(channel.keys.scale_keys, 3))
+        f.write(_pack_keys(channel.keys.position_keys, 3))
+        f.write(_pack_keys(channel.keys.rotation_keys, 4))
+
+
+def _pack_keys(keys, width: int) -> bytes:
+    """
+    打包一组关键帧
+    
+    格式: int32(num_keys) + [float(time) + float×width(value), ...]
+    
+    参数:
+        keys: [(time, value), ...]
+        width: 每个值的分量数（Vector3 为 3，Quaternion 为 4）
+    
+    返回:
+        打包后的字节
+    """
+    flat = []
+    for time, value in keys:
+        flat.append(time)
+        flat.extend(value[:width])
+    return struct.pack(f"<i{len(flat)}f", len(keys), *flat)
 
 
 def write_animation(filepath: str, animation: Animation) -> None:
@@ -5,8 +5,11 @@
 # - 严重性：ERROR / WARNING / INFO
 # - 格式：时间戳 | 严重性 | 错误码 | 消息 | 对象名
 
+import io
 import time
-from typing import List, Optional
+from collections import Counter, deque
+from typing import Deque, Optional
+from ..core.io.buffering import open_for_write
 from ..core.schema import AuditEntry
 
 
@@ -26,7 +29,8 @@ class AuditLogger:
     
     def __init__(self, filepath: str):
         self.filepath = filepath
-        self.entries: List[AuditEntry] = []
+        # 只追加、顺序遍历：deque 按固定大小的块增长，条目很多时不会整体扩容复制
+        self.entries: Deque[AuditEntry] = deque()
     
     def _add_entry(self, severity: str, message: str, 
                    code: str = "", object_name: Optional[str] = None) -> None:
@@ -53,21 +57,25 @@ class AuditLogger:
         self._add_entry("ERROR", message, code, object_name)
     
     def save(self) -> None:
-        """保存 audit.log 到文件"""
-        with open(self.filepath, "w", encoding="utf-8") as f:
-            f.write("# BigWorld Export Audit Log\n")
-            f.write(f"# Generated: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())}\n")
-            f.write("# Format: [Timestamp] [Severity] [Code] Message | Object\n")
-            f.write("#" + "="*70 + "\n\n")
-            
-            for entry in self.entries:
-                line = f"[{entry.timestamp}] [{entry.severity}]"
-                if entry.code:
-                    line += f" [{entry.code}]"
-                line += f" {entry.message}"
-                if entry.object_name:
-                    line += f" | Object: {entry.object_name}"
-                f.write(line + "\n")
+        """保存 audit.log 到文件（先在内存中拼好全文，再一次写出）"""
+        buf = io.StringIO()
+        w = buf.write
+        w("# BigWorld Export Audit Log\n")
+        w(f"# Generated: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())}\n")
+        w("# Format: [Timestamp] [Severity] [Code] Message | Object\n")
+        w("#" + "="*70 + "\n\n")
+        
+        for entry in self.entries:
+            w(f"[{entry.timestamp}] [{entry.severity}]")
+            if entry.code:
+                w(f" [{entry.code}]")
+            w(f" {entry.message}")
+            if entry.object_name:
+                w(f" | Object: {entry.object_name}")
+            w("\n")
+        
+        with open_for_write(self.filepath, "w", encoding="utf-8") as f:
+            f.write(buf.getvalue())
     
     def has_errors(self) -> bool:
         """检查是否有错误"""
@@ -79,11 +87,10 @@ class AuditLogger:
     
     def get_summary(self) -> str:
         """获取摘要"""
-        error_count = sum(1 for e in self.entries if e.severity == "ERROR")
-        warning_count = sum(1 for e in self.entries if e.severity == "WARNING")
-        info_count = sum(1 for e in self.entries if e.severity == "INFO")
+        # 一次遍历统计各级别数量
+        counts = Counter(e.severity for e in self.entries)
         
-        return f"导出完成: {error_count} 错误, {warning_count} 警告, {info_count} 信息"
+        return f"导出完成: {counts['ERROR']} 错误, {counts['WARNING']} 警告, {counts['INFO']} 信息"
 
 
 # ==================== 错误码定义 ====================
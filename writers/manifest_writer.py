@@ -2,16 +2,144 @@
 # Purpose: 生成 manifest.json，记录所有导出产物与依赖关系
 # Notes:
 # - 记录文件路径、类型、hash、时间戳、依赖关系
+# - 记录源数据指纹，重复导出时跳过未变化的文件（增量导出）；
+#   指纹包含写出代码的版本盐值，writer/格式代码改动后旧文件会全部重写
 # - 用于版本控制、增量构建、CI 校验
 # - 格式：JSON
+# - 每个条目先追加一行到 manifest.log（预写日志，O(1)），save() 写出完整快照后删除日志；
+#   导出中断时下次启动会回放日志，已写完的文件仍能按指纹跳过
 
+import dataclasses
+import enum
 import json
 import hashlib
+import os
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from ..core.io.buffering import fsync_directory, open_for_write
 from ..core.schema import Manifest, ManifestEntry
 
+# orjson 为可选依赖（Blender 自带的 Python 不包含），不可用时使用标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(data, indent: bool = False) -> bytes:
+    """
+    序列化为 UTF-8 JSON（优先使用 orjson，直接得到 bytes）
+    
+    参数:
+        data: 要序列化的数据
+        indent: 是否按 2 空格缩进
+    
+    返回:
+        JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+# 输出格式版本：写出格式有不兼容的改动时递增（与下面的代码摘要一起作为指纹盐值）
+FINGERPRINT_VERSION = 1
+
+# 决定输出文件字节的代码（相对插件根目录）；源数据之外，这些代码改动也必须让指纹失效
+_WRITER_SOURCES = ("writers", os.path.join("core", "io"), os.path.join("core", "formats"),
+                   "export_dispatcher.py")
+
+
+@lru_cache(maxsize=1)
+def _fingerprint_salt() -> bytes:
+    """
+    指纹盐值：格式版本 + 写出代码的摘要（每次加载插件只计算一次）
+    
+    源码不可读时（如只分发 .pyc）只使用格式版本
+    """
+    digest = hashlib.blake2b(f"v{FINGERPRINT_VERSION}".encode("ascii"), digest_size=16)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for rel in _WRITER_SOURCES:
+        path = os.path.join(root, rel)
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".py"))
+        else:
+            files = [path]
+        for filepath in files:
+            try:
+                with open(filepath, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            digest.update(os.path.relpath(filepath, root).replace("\\", "/").encode("utf-8"))
+            digest.update(data)
+    return digest.digest()
+
+
+def _feed(digest, value) -> None:
+    """
+    按确定的规则把值写入摘要（不依赖 pickle 协议、numpy 版本或对象 id）
+    
+    numpy 数组按 dtype、形状与原始字节写入（连续数组不复制）；
+    dataclass 按类名与字段顺序递归；dict 按键排序
+    """
+    if isinstance(value, np.ndarray):
+        digest.update(f"nd{value.dtype.str}{value.shape}".encode("ascii"))
+        digest.update(memoryview(np.ascontiguousarray(value)).cast("B"))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = memoryview(value).cast("B")
+        digest.update(b"b%d:" % data.nbytes)
+        digest.update(data)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        digest.update(b"s%d:" % len(data))
+        digest.update(data)
+    elif isinstance(value, enum.Enum):
+        digest.update(f"e{type(value).__name__}.{value.name};".encode("utf-8"))
+    elif value is None or isinstance(value, (bool, int, float, np.generic)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode("ascii"))
+    elif dataclasses.is_dataclass(value):
+        digest.update(f"D{type(value).__name__}(".encode("utf-8"))
+        for field in dataclasses.fields(value):
+            digest.update(field.name.encode("utf-8"))
+            _feed(digest, getattr(value, field.name))
+        digest.update(b")")
+    elif isinstance(value, dict):
+        digest.update(b"{%d" % len(value))
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[%d" % len(value))
+        for item in value:
+            _feed(digest, item)
+        digest.update(b"]")
+    else:
+        raise TypeError(f"无法计算指纹的类型: {type(value).__name__}")
+
+
+def compute_fingerprint(*parts) -> str:
+    """
+    计算源数据指纹（按确定规则逐字段做 blake2b 摘要，以写出代码版本为盐值）
+    
+    参数:
+        parts: 决定输出文件内容的数据（Primitives / Visual / Model / Animation 及引用路径）
+    
+    返回:
+        十六进制指纹；包含无法处理的类型时返回空串（视为总是变化）
+    """
+    digest = hashlib.blake2b(_fingerprint_salt(), digest_size=16)
+    try:
+        _feed(digest, parts)
+    except Exception:
+        return ""
+    return digest.hexdigest()
+
 
 class ManifestWriter:
     """
@@ -25,23 +153,74 @@ class ManifestWriter:
         writer.add_entry("models/hero.visual", "visual", dependencies=["models/hero.primitives"])
         writer.add_entry("models/hero.model", "model", dependencies=["models/hero.visual"])
         writer.save()
+    
+    上一次导出的 manifest.json 中的指纹（以及中断导出遗留的 manifest.log）在构造时读入，
+    通过 previous_fingerprint() 查询
     """
     
     def __init__(self, filepath: str):
         self.filepath = filepath
+        self.log_path = str(Path(filepath).with_name("manifest.log"))
         self.manifest = Manifest(version=1)
+        self._previous_fingerprints = self._load_fingerprints()
+        self._log_file = None  # 第一次 add_entry 时打开
+    
+    def _load_fingerprints(self) -> Dict[Tuple[str, str], str]:
+        """
+        读取已有 manifest.json 中的指纹，再回放 manifest.log 中更新的条目
+        （文件不存在或损坏时跳过）
+        
+        以 (文件路径, 类型) 为键：.visual 与 .model 去掉扩展名后路径相同
+        """
+        fingerprints = {}
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for entry in data.get("entries", []):
+                fingerprints[(entry["file"], entry["type"])] = entry.get("fingerprint", "")
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        
+        # 日志只保存上一次快照之后的条目，存在即说明上次导出没有正常结束
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        fingerprints[(entry["file"], entry["type"])] = entry.get("fingerprint", "")
+                    except (ValueError, KeyError, TypeError):
+                        break  # 崩溃时写了一半的最后一行
+        except OSError:
+            pass
+        
+        return fingerprints
+    
+    def previous_fingerprint(self, file_path: str, file_type: str) -> str:
+        """
+        获取上一次导出时记录的指纹
+        
+        参数:
+            file_path: 文件路径（与 add_entry 使用的路径一致）
+            file_type: 文件类型
+        
+        返回:
+            指纹，没有记录时返回空串
+        """
+        return self._previous_fingerprints.get((file_path, file_type), "")
     
     def add_entry(self, 
                   file_path: str, 
                   file_type: str, 
-                  dependencies: List[str] = None) -> None:
+                  dependencies: Sequence[str] = (),
+                  fingerprint: str = "") -> None:
         """
         添加文件条目
         
         参数:
             file_path: 文件路径（相对资源根目录）
             file_type: 文件类型（primitives / visual / model / animation / collision / portal）
-            dependencies: 依赖文件列表（相对路径）
+            dependencies: 依赖文件序列（相对路径）；以元组保存，传入元组时不复制
+            fingerprint: 源数据指纹（compute_fingerprint 的结果）
         """
         # 计算文件 hash（如果文件存在）
         file_hash = ""
@@ -52,32 +231,62 @@ class ManifestWriter:
         entry = ManifestEntry(
             file=file_path,
             file_type=file_type,
-            dependencies=dependencies or [],
+            dependencies=tuple(dependencies) if dependencies else (),
             hash=file_hash,
+            fingerprint=fingerprint,
             timestamp=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
         )
         
         self.manifest.entries.append(entry)
+        
+        # 预写日志：每个条目一行，追加写入
+        if self._log_file is None:
+            self._log_file = open(self.log_path, "ab", buffering=65536)
+        self._log_file.write(_dumps(self._entry_to_dict(entry)) + b"\n")
+    
+    @staticmethod
+    def _entry_to_dict(entry: ManifestEntry) -> dict:
+        """条目的 JSON 表示（manifest.json 与 manifest.log 共用）"""
+        return {
+            "file": entry.file,
+            "type": entry.file_type,
+            "dependencies": entry.dependencies,
+            "hash": entry.hash,
+            "fingerprint": entry.fingerprint,
+            "timestamp": entry.timestamp
+        }
     
     def save(self) -> None:
-        """保存 manifest.json 到文件"""
+        """保存 manifest.json 快照到文件，之后删除已被快照覆盖的 manifest.log"""
         data = {
             "version": self.manifest.version,
             "generated": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-            "entries": [
-                {
-                    "file": entry.file,
-                    "type": entry.file_type,
-                    "dependencies": entry.dependencies,
-                    "hash": entry.hash,
-                    "timestamp": entry.timestamp
-                }
-                for entry in self.manifest.entries
-            ]
+            "entries": [self._entry_to_dict(entry) for entry in self.manifest.entries]
         }
         
-        with open(self.filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # 原子替换：manifest 是整次导出的提交点，不能留下写了一半的文件；
+        # 只在这里 fsync（文件与所在目录），各输出文件不逐个刷盘
+        with open_for_write(self.filepath, "wb", fsync=True) as f:
+            f.write(_dumps(data, indent=True))
+        fsync_directory(os.path.dirname(os.path.abspath(self.filepath)))
+        
+        self._discard_log()
+    
+    def close(self) -> None:
+        """
+        关闭 manifest.log 句柄但保留文件（未 save 时下次导出会回放其中的条目）
+        """
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+    
+    def _discard_log(self) -> None:
+        """关闭并删除 manifest.log（内容已全部包含在快照中）"""
+        self.close()
+        try:
+            os.remove(self.log_path)
+        except OSError:
+            pass
     
     def get_dependency_graph(self) -> dict:
         """
@@ -174,18 +174,15 @@ class ModelWriter:
             </transform>
         </hardPoint>
         """
-        from ..core.io.xml_writer import format_float
+        from ..core.io.xml_writer import create_matrix_node
         
         for hp in hardpoints:
             hp_node = root.add_child("hardPoint")
             hp_node.add_child("name", hp.name)
             hp_node.add_child("identifier", hp.identifier)
             
-            # 写入4x3变换矩阵
-            transform_node = hp_node.add_child("transform")
-            for i in range(4):
-                row_values = " ".join([format_float(v) for v in hp.transform[i]])
-                transform_node.add_child("row{0}".format(i), row_values)
+            # 写入4x3变换矩阵（单位矩阵直接使用预格式化的行）
+            hp_node.children.append(create_matrix_node("transform", hp.transform))
     
     def _write_metadata(self, root: DataSectionNode, model: Model) -> None:
         """
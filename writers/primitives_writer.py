@@ -5,10 +5,151 @@
 # - 支持 BSP 数据（可选）
 # - 严格对齐 BigWorld 源码的字段顺序与字节对齐
 
-from typing import List
+import logging
+import threading
+from typing import List, Tuple
+
+import numpy as np
 from ..core.io.bin_section_writer import BinSectionWriter
 from ..core.schema import Primitives, PrimitiveGroup
 from ..core.formats.vertex_format import build_vertex_format
+from ..core.formats.packed_normal import pack_normals
+
+# 诊断信息走 logging（与 export_builders 一致，按日志级别过滤，格式化延迟到真正输出时）
+log = logging.getLogger(__name__)
+
+# 顶点区暂存缓冲区（按线程复用，批量导出多个模型时不反复分配大块内存）
+# 超过上限的缓冲区用完即弃，避免一个超大模型的内存一直被占用
+_SCRATCH = threading.local()
+_SCRATCH_KEEP_LIMIT = 16 * 1024 * 1024
+
+
+def _get_scratch_buffer(size: int) -> bytearray:
+    """
+    取得至少 size 字节的暂存缓冲区（内容未清零，调用方需覆盖写满所用部分）
+    
+    参数:
+        size: 需要的字节数
+    
+    返回:
+        bytearray
+    """
+    buf = getattr(_SCRATCH, "buffer", None)
+    if buf is not None and len(buf) >= size:
+        return buf
+    
+    buf = bytearray(size)
+    if size <= _SCRATCH_KEEP_LIMIT:
+        _SCRATCH.buffer = buf
+    return buf
+
+
+def _vertex_layout(primitives: Primitives) -> Tuple[bool, bool, bool, bool, bool, bool]:
+    """
+    顶点记录包含的属性（各属性可以是元组列表或 ndarray，统一用 len() 判断是否存在）
+    
+    返回:
+        (has_normals, has_uvs, has_tangents, has_binormals, has_colors, has_skin)
+    """
+    has_tangents = len(primitives.tangents) > 0
+    return (
+        len(primitives.normals) > 0,
+        len(primitives.uvs) > 0,
+        has_tangents,
+        has_tangents and len(primitives.binormals) > 0,
+        len(primitives.colors) > 0,
+        len(primitives.bone_indices) > 0,
+    )
+
+
+def _vertex_dtype(has_normals: bool, has_uvs: bool, has_tangents: bool,
+                  has_binormals: bool, has_colors: bool, has_skin: bool) -> np.dtype:
+    """
+    构建单个顶点记录的结构化 dtype（紧凑小端，字段顺序与 vertex_format 一致）
+    
+    返回:
+        np.dtype
+    """
+    fields = [("xyz", "<f4", (3,))]                   # xyz
+    if has_normals:
+        # 静态模型使用Vector3 normal_ (12字节)
+        # 只有带切线/副切线的模型才使用packed normal (4字节)
+        fields.append(("n", "<u4") if has_tangents else ("n", "<f4", (3,)))
+    if has_uvs:
+        fields.append(("uv", "<f4", (2,)))            # uv
+    if has_tangents:
+        fields.append(("t", "<u4"))                   # t（packed uint32, 不是Vector3!）
+        if has_binormals:
+            fields.append(("b", "<u4"))               # b（packed）
+    if has_colors:
+        fields.append(("c", "<f4", (4,)))             # c（RGBA 4 floats）
+    if has_skin:
+        fields.append(("i", "u1", (3,)))              # iii
+        fields.append(("w", "u1", (2,)))              # ww
+    return np.dtype(fields)
+
+
+def _skin_arrays(bone_indices, bone_weights) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    生成蒙皮字段（3个骨骼索引 + 2个权重，均为 uint8）
+    
+    参数:
+        bone_indices: (N, 3+) 骨骼索引
+        bone_weights: (N, 2+) 骨骼权重（0-255）
+    
+    返回:
+        (indices, weights) 两个 uint8 数组
+    """
+    indices = np.asarray(bone_indices, dtype=np.int64).reshape(len(bone_indices), -1)[:, :3]
+    weights = np.asarray(bone_weights, dtype=np.float64).reshape(len(bone_weights), -1)[:, :2]
+    
+    # 注意：BigWorld支持的最大骨骼索引是255，超出范围的索引暂时映射到根骨骼，避免崩溃
+    overflow = indices > 255
+    if overflow.any():
+        log.warning("%d 个骨骼索引超出范围(0-255)，映射到根骨骼", int(overflow.sum()))
+    indices = np.where(overflow | (indices < 0), 0, indices).astype(np.uint8)
+    
+    # 骨骼权重 (2 bytes) - uint8 (0-255)，255=100%
+    weights = np.clip(np.trunc(weights), 0, 255).astype(np.uint8)
+    return indices, weights
+
+
+def pack_interleaved(primitives: Primitives, buffer=None) -> np.ndarray:
+    """
+    把分开存放的顶点属性交错打包为 .primitives 顶点记录
+    
+    参数:
+        primitives: Primitives 数据结构
+        buffer: 可选的可写缓冲区（至少 num_vertices * itemsize 字节），结果直接写入其中
+    
+    返回:
+        (N,) 结构化数组，tobytes() 即顶点区的原始数据
+    """
+    has_normals, has_uvs, has_tangents, has_binormals, has_colors, has_skin = layout = \
+        _vertex_layout(primitives)
+    dtype = _vertex_dtype(*layout)
+    num_vertices = len(primitives.vertices)
+    if buffer is None:
+        records = np.empty(num_vertices, dtype=dtype)
+    else:
+        records = np.frombuffer(buffer, dtype=dtype, count=num_vertices)
+    if num_vertices == 0:
+        return records
+    
+    records["xyz"] = primitives.vertices
+    if has_normals:
+        records["n"] = pack_normals(primitives.normals) if has_tangents else primitives.normals
+    if has_uvs:
+        records["uv"] = primitives.uvs
+    if has_tangents:
+        records["t"] = pack_normals(primitives.tangents)
+        if has_binormals:
+            records["b"] = pack_normals(primitives.binormals)
+    if has_colors:
+        records["c"] = primitives.colors
+    if has_skin:
+        records["i"], records["w"] = _skin_arrays(primitives.bone_indices, primitives.bone_weights)
+    return records
 
 
 class PrimitivesWriter:
@@ -45,18 +186,18 @@ class PrimitivesWriter:
         print(f"  索引数量: {len(primitives.indices)}")
         print(f"  PrimitiveGroup 数量: {len(primitives.groups)}")
         print(f"  BSP 数据: {bool(primitives.bsp_data)}")
-        print(f"  有法线: {bool(primitives.normals)}")
-        print(f"  有UV: {bool(primitives.uvs)}")
-        print(f"  有切线: {bool(primitives.tangents)}")
-        print(f"  有骨骼索引: {bool(primitives.bone_indices)}")
+        print(f"  有法线: {len(primitives.normals) > 0}")
+        print(f"  有UV: {len(primitives.uvs) > 0}")
+        print(f"  有切线: {len(primitives.tangents) > 0}")
+        print(f"  有骨骼索引: {len(primitives.bone_indices) > 0}")
         print(f"  骨骼索引数量: {len(primitives.bone_indices)}")
         print(f"  骨骼权重数量: {len(primitives.bone_weights)}")
         
         # 检查蒙皮数据内容
-        if primitives.bone_indices:
-            print(f"  骨骼索引示例: {primitives.bone_indices[0] if primitives.bone_indices else 'None'}")
-        if primitives.bone_weights:
-            print(f"  骨骼权重示例: {primitives.bone_weights[0] if primitives.bone_weights else 'None'}")
+        if len(primitives.bone_indices) > 0:
+            print(f"  骨骼索引示例: {primitives.bone_indices[0]}")
+        if len(primitives.bone_weights) > 0:
+            print(f"  骨骼权重示例: {primitives.bone_weights[0]}")
         
         # 检查顶点格式
         if primitives.vertex_format:
@@ -88,20 +229,8 @@ class PrimitivesWriter:
             print(f"DEBUG: 生成文件大小: {file_size} 字节 ({file_size/1024:.1f} KB)")
         
         except Exception as e:
-            # 确保文件被关闭
-            if bw.fp:
-                try:
-                    bw.fp.close()
-                except:
-                    pass
-            
-            # 清理失败的文件
-            import os
-            if os.path.exists(self.filepath):
-                try:
-                    os.remove(self.filepath)
-                except:
-                    pass
+            # 丢弃写了一半的临时文件（目标路径上的旧文件不受影响）
+            bw.abort()
             
             raise RuntimeError(f"写入 .primitives 文件失败: {e}")
     
@@ -114,10 +243,10 @@ class PrimitivesWriter:
         if not vertex_format:
             # 动态生成
             vertex_format = build_vertex_format(
-                has_normals=bool(primitives.normals),
-                has_uv=bool(primitives.uvs),
-                has_tangent=bool(primitives.tangents),
-                has_color=bool(primitives.colors),
+                has_normals=len(primitives.normals) > 0,
+                has_uv=len(primitives.uvs) > 0,
+                has_tangent=len(primitives.tangents) > 0,
+                has_color=len(primitives.colors) > 0,
                 has_skin=(len(primitives.bone_indices) > 0 and len(primitives.bone_weights) > 0)  # 修复：检查长度而不是bool
             )
         print(f"  生成的顶点格式: {vertex_format.rstrip(chr(0))}")
@@ -128,64 +257,13 @@ class PrimitivesWriter:
         bw.write_uint32(num_vertices)
         
         # 3. 写入顶点数据（按 vertex_format 顺序）
-        for i in range(num_vertices):
-            # 位置 (xyz) - 必须
-            bw.write_vector3(primitives.vertices[i])
-            
-            # 法线 (n) - 如果有
-            if primitives.normals:
-                # 静态模型使用Vector3 normal_ (12字节)
-                # 只有带切线/副切线的模型才使用packed normal (4字节)
-                if primitives.tangents:
-                    # 带切线/副切线的模型使用packed normal
-                    bw.write_packed_normal(primitives.normals[i])
-                else:
-                    # 静态模型使用Vector3 normal
-                    bw.write_vector3(primitives.normals[i])
-            
-            # UV (uv) - 如果有
-            if primitives.uvs:
-                bw.write_vector2(primitives.uvs[i])
-            
-            # 切线/副切线 (tb) - 如果有 (packed uint32, 不是Vector3!)
-            if primitives.tangents:
-                bw.write_packed_normal(primitives.tangents[i])
-                if primitives.binormals:
-                    bw.write_packed_normal(primitives.binormals[i])
-            
-            # 顶点颜色 (c) - 如果有
-            if primitives.colors:
-                # RGBA 4 floats
-                color = primitives.colors[i]
-                for c in color:
-                    bw.write_float(c)
-            
-            # 蒙皮数据 (iiiww) - 如果有
-            if primitives.bone_indices:
-                # 骨骼索引 (3 bytes) - uint8
-                # 注意：BigWorld支持的最大骨骼索引是255，如果超过需要重新映射
-                indices = primitives.bone_indices[i]
-                for j in range(3):
-                    bone_idx = int(indices[j])
-                    # 确保索引在有效范围内
-                    if bone_idx < 0:
-                        safe_index = 0  # 无效索引映射到根骨骼
-                    elif bone_idx > 255:
-                        # 如果骨骼数量超过255，需要重新映射到0-255范围
-                        # 这里暂时映射到根骨骼，避免崩溃
-                        safe_index = 0
-                        print(f"WARNING: 骨骼索引 {bone_idx} 超出范围(0-255)，映射到根骨骼")
-                    else:
-                        safe_index = bone_idx
-                    bw.write_byte(safe_index)
-                
-                # 骨骼权重 (2 bytes) - uint8 (0-255)
-                # 注意：BigWorld使用uint8权重，255=100%
-                weights = primitives.bone_weights[i]
-                for j in range(2):
-                    # 权重应该已经是0-255范围的整数
-                    safe_weight = min(max(int(weights[j]), 0), 255)
-                    bw.write_byte(safe_weight)
+        # 各属性整列交错打包到暂存缓冲区上的结构化数组，最后一次写入
+        data_size = _vertex_dtype(*_vertex_layout(primitives)).itemsize * num_vertices
+        vertex_data = _get_scratch_buffer(data_size)
+        pack_interleaved(primitives, vertex_data)
+        
+        with memoryview(vertex_data) as view:
+            bw.write_bytes(view[:data_size])
         
         bw.end_section()
     
@@ -11,6 +11,7 @@ from ..core.io.xml_writer import (
     DataSectionNode,
     create_matrix_node,
     create_bbox_node,
+    IDENTITY_MATRIX_4X3,
     format_vector3,
     format_bool,
     format_int
@@ -102,13 +103,7 @@ class VisualWriter:
         node.add_child("identifier", "Scene Root")
         
         # 单位矩阵
-        identity_matrix = [
-            [1.0, 0.0, 0.0],
-            [0.0, 1.0, 0.0],
-            [0.0, 0.0, 1.0],
-            [0.0, 0.0, 0.0]
-        ]
-        transform_node = create_matrix_node("transform", identity_matrix)
+        transform_node = create_matrix_node("transform", IDENTITY_MATRIX_4X3)
         node.children.append(transform_node)
     
     def _write_render_set(self, root: DataSectionNode, render_set: RenderSet) -> None:
@@ -243,13 +238,7 @@ class VisualWriter:
         scene_root.add_child("identifier", "Scene Root")
         
         # Scene Root 的变换矩阵（单位矩阵）
-        identity_matrix = [
-            [1.0, 0.0, 0.0],
-            [0.0, 1.0, 0.0],
-            [0.0, 0.0, 1.0],
-            [0.0, 0.0, 0.0]
-        ]
-        transform_node = create_matrix_node("transform", identity_matrix)
+        transform_node = create_matrix_node("transform", IDENTITY_MATRIX_4X3)
         scene_root.children.append(transform_node)
         
         # 如果visual有skeleton信息，构建骨骼层级
@@ -269,11 +258,14 @@ class VisualWriter:
             parent_node: 父节点（通常是Scene Root）
             skeleton: Skeleton数据结构
         """
-        # 构建骨骼索引映射
-        bone_map = {bone.name: bone for bone in skeleton.bones}
+        # 一次遍历建立 父骨骼名 → 子骨骼列表 的映射（保持骨骼原有顺序）
+        # 根骨骼（没有父骨骼的）挂在 None 下
+        children_map = {}
+        for bone in skeleton.bones:
+            children_map.setdefault(bone.parent, []).append(bone)
         
-        # 找到所有根骨骼（没有父骨骼的）
-        root_bones = [bone for bone in skeleton.bones if bone.parent is None]
+        # 找到所有根骨骼
+        root_bones = children_map.get(None, [])
         
         print(f"DEBUG: _build_bone_hierarchy - 根骨骼数量: {len(root_bones)}")
         for rb in root_bones:
@@ -282,17 +274,16 @@ class VisualWriter:
         # 递归写入每个根骨骼及其子树
         for root_bone in root_bones:
             print(f"DEBUG: 开始递归写入骨骼树，根: {root_bone.name}")
-            self._write_bone_node(parent_node, root_bone, bone_map, skeleton.bones)
+            self._write_bone_node(parent_node, root_bone, children_map)
     
-    def _write_bone_node(self, parent_node: DataSectionNode, bone, bone_map: dict, all_bones: list) -> None:
+    def _write_bone_node(self, parent_node: DataSectionNode, bone, children_map: dict) -> None:
         """
         递归写入单个骨骼节点及其子骨骼
         
         参数:
             parent_node: 父XML节点
             bone: 当前骨骼
-            bone_map: 骨骼名称到骨骼对象的映射
-            all_bones: 所有骨骼列表
+            children_map: 父骨骼名称到子骨骼列表的映射
         """
         # 创建当前骨骼节点
         bone_node = parent_node.add_child("node")
@@ -303,9 +294,8 @@ class VisualWriter:
         bone_node.children.append(transform_node)
         
         # 递归写入子骨骼
-        child_bones = [b for b in all_bones if b.parent == bone.name]
-        for child_bone in child_bones:
-            self._write_bone_node(bone_node, child_bone, bone_map, all_bones)
+        for child_bone in children_map.get(bone.name, ()):
+            self._write_bone_node(bone_node, child_bone, children_map)
     
     def _convert_texture_path(self, texture_path: str) -> str:
         """